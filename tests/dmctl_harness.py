@@ -0,0 +1,197 @@
+"""Plumbing shared by the test modules that drive tools/dmctl; not a test module itself."""
+
+import importlib.machinery
+import importlib.util
+import json
+import os
+import secrets
+import shutil
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+ROOT = Path(__file__).resolve().parents[1]
+DMCTL = ROOT / "tools" / "dmctl"
+DMCTL_STR = str(DMCTL)
+ROOT_STR = str(ROOT)
+
+# DMCTL_SUBPROCESS=1 runs every command in its own dmctl process instead of the shared repl worker.
+USE_SUBPROCESS = os.environ.get("DMCTL_SUBPROCESS") == "1"
+# Scratch campaigns live in the platform temp dir; DMCTL_TEST_RAMDISK=1 moves them to /dev/shm.
+USE_RAMDISK = os.environ.get("DMCTL_TEST_RAMDISK") == "1" and os.path.isdir("/dev/shm")
+# DMCTL_TEST_KEEP=1 leaves each module's scratch root behind for debugging.
+KEEP_SCRATCH = os.environ.get("DMCTL_TEST_KEEP") == "1"
+
+
+# Baseline world seeded once per suite and restored for every test via DmctlSession.snapshot/restore.
+SEED_PAYLOAD = {
+    "locations": [
+        {"id": "loc_start", "name": "Larkspur", "region": "Greenmarch"},
+        {"id": "loc_keep", "name": "Old Keep", "region": "Greenmarch"},
+    ],
+    "player_characters": [
+        {
+            "id": "pc_hero",
+            "name": "Arin Vale",
+            "class": "Rogue",
+            "level": 3,
+            "max_hp": 24,
+            "current_hp": 24,
+            "ac": 15,
+            "location_id": "loc_start",
+            "initiative_mod": 3,
+        }
+    ],
+    "npcs": [
+        {"id": "npc_mayor", "name": "Mayor Elira Thorn", "location_id": "loc_start", "max_hp": 11, "current_hp": 11, "ac": 12},
+        {"id": "npc_sergeant", "name": "Sergeant Bram", "location_id": "loc_start", "max_hp": 12, "current_hp": 12, "ac": 13},
+        {"id": "npc_scholar", "name": "Scholar Nyx", "location_id": "loc_start", "max_hp": 9, "current_hp": 9, "ac": 11},
+    ],
+    "world_state": {
+        "world_date": "2 Ches 1492 DR",
+        "world_time": "10:00",
+        "weather": "clear",
+        "region": "Greenmarch",
+        "location_id": "loc_start",
+    },
+}
+
+
+# orjson is an optional speedup; the stdlib path stays the reference behavior.
+# Both sides work on raw bytes so dmctl output never goes through a text layer.
+if orjson is not None:
+    decode = orjson.loads
+    encode = orjson.dumps
+else:
+    decode = json.loads
+    _json_encoder = json.JSONEncoder(separators=(",", ":"))
+
+    def encode(value):
+        return _json_encoder.encode(value).encode()
+
+
+def check_body(body, description, expect_ok):
+    if expect_ok and not body.get("ok"):
+        raise AssertionError(f"Command failed unexpectedly. {description} BODY={body}")
+    if not expect_ok and body.get("ok"):
+        raise AssertionError(f"Command unexpectedly succeeded. {description} BODY={body}")
+    return body
+
+
+def load_dmctl():
+    """Import tools/dmctl (no .py suffix) as a module so tests can call its helpers directly."""
+    module = sys.modules.get("dmctl")
+    if module is None:
+        sys.path.insert(0, str(DMCTL.parent))
+        loader = importlib.machinery.SourceFileLoader("dmctl", DMCTL_STR)
+        module = importlib.util.module_from_spec(importlib.util.spec_from_loader("dmctl", loader))
+        sys.modules["dmctl"] = module
+        loader.exec_module(module)
+    return module
+
+
+class DmctlSession:
+    """A scratch campaigns root handed to dmctl via DMCTL_CAMPAIGNS_ROOT and the repl worker serving it."""
+
+    def __init__(self, prefix):
+        self.scratch_root = Path(tempfile.mkdtemp(prefix=prefix, dir="/dev/shm" if USE_RAMDISK else None))
+        self.campaigns_root = self.scratch_root / "campaigns"
+        # Test campaigns are thrown away, so skip fsyncs on every commit.
+        self.env = {**os.environ, "DMCTL_CAMPAIGNS_ROOT": str(self.campaigns_root), "DMCTL_SQLITE_SYNC": "OFF"}
+        self._cleanup = ThreadPoolExecutor(max_workers=1)
+        self._worker = None
+        if not USE_SUBPROCESS:
+            # Pipes Python opens are non-inheritable anyway, so skip the per-spawn fd sweep.
+            self._worker = subprocess.Popen(
+                [DMCTL_STR, "repl"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                cwd=ROOT_STR,
+                env=self.env,
+                close_fds=False,
+            )
+
+    def close(self):
+        if self._worker is not None:
+            self._worker.stdin.close()
+            self._worker.wait(timeout=30)
+            self._worker.stdout.close()
+            self._worker = None
+        self._cleanup.shutdown(wait=True)
+        if KEEP_SCRATCH:
+            print(f"dmctl scratch root kept at {self.scratch_root}")
+        else:
+            shutil.rmtree(self.scratch_root, ignore_errors=True)
+
+    def run(self, *parts, payload=None, expect_ok=True):
+        if self._worker is None:
+            return self.run_subprocess(*parts, payload=payload, expect_ok=expect_ok)
+
+        request = {"argv": list(parts)}
+        if payload is not None:
+            request["payload"] = payload
+        self._worker.stdin.write(encode(request) + b"\n")
+        self._worker.stdin.flush()
+        line = self._worker.stdout.readline()
+        if not line:
+            raise AssertionError(f"dmctl repl exited unexpectedly. REQUEST={request}")
+        try:
+            body = decode(line)
+        except json.JSONDecodeError as exc:
+            raise AssertionError(f"Command did not return JSON. REQUEST={request} STDOUT={line}") from exc
+        return check_body(body, f"REQUEST={request}", expect_ok)
+
+    def run_subprocess(self, *parts, payload=None, expect_ok=True):
+        """Run one command in a new dmctl process, bypassing the repl worker."""
+        cmd = [DMCTL_STR, *parts]
+        if payload is not None:
+            cmd.extend(["--payload", encode(payload)])
+        return self.run_json(cmd, expect_ok=expect_ok)
+
+    def run_json(self, cmd, expect_ok=True):
+        result = subprocess.run(cmd, capture_output=True, cwd=ROOT_STR, env=self.env, close_fds=False, check=False)
+        try:
+            body = decode(result.stdout)
+        except json.JSONDecodeError as exc:
+            raise AssertionError(
+                f"Command did not return JSON. CMD={cmd} STDOUT={result.stdout.decode(errors='replace')} "
+                f"STDERR={result.stderr.decode(errors='replace')}"
+            ) from exc
+        return check_body(body, f"CMD={cmd} STDERR={result.stderr!r}", expect_ok)
+
+    def run_turn(self, campaign_id, commands, summary):
+        # turn begin, the given commands and turn commit as one dmctl batch; returns every step's envelope.
+        steps = [{"argv": ["turn", "begin"]}, *commands, {"argv": ["turn", "commit", "--summary", summary]}]
+        return self.run("batch", "--campaign", campaign_id, payload={"commands": steps})["data"]["results"]
+
+    def snapshot(self, campaign_id):
+        """Move a seeded campaign out of the campaigns root and return the template to restore() from."""
+        # Campaign ids are stored inside campaign.db, so a template keeps its id and is
+        # restored by copying the directory back rather than re-seeding.
+        template = self.scratch_root / "templates" / campaign_id
+        template.parent.mkdir(exist_ok=True)
+        os.rename(self.campaigns_root / campaign_id, template)
+        return template
+
+    def restore(self, template):
+        """Copy a snapshot back into the campaigns root and return its campaign id; close() removes the template."""
+        shutil.copytree(template, self.campaigns_root / template.name)
+        return template.name
+
+    def discard(self, path):
+        # Rename out of the way now; the actual unlinking overlaps with the next test.
+        trash = self.scratch_root / f"trash_{secrets.token_hex(8)}"
+        os.rename(path, trash)
+        self._cleanup.submit(shutil.rmtree, trash, ignore_errors=True)
+
+    def discard_campaign(self, campaign_id):
+        cdir = self.campaigns_root / campaign_id
+        if cdir.exists():
+            self.discard(cdir)
@@ -1,50 +1,70 @@
-import json
-import shutil
 import subprocess
+import sys
 import unittest
 import uuid
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
+
+sys.path.insert(0, str(ROOT / "tests"))
+from dmctl_harness import DMCTL_STR, ROOT_STR, DmctlSession, decode, encode  # noqa: E402
+
+# Shared by every seeded NPC in test_00; only the name varies.
+SEED_NPC_FIELDS = {
+    "location_id": "loc_town",
+    "max_hp": 11,
+    "current_hp": 11,
+    "ac": 12,
+    "trust": 0,
+    "fear": 0,
+    "debt": 0,
+    "reputation": 0,
+}
+
+_session = None
+
+
+def setUpModule():
+    global _session
+    _session = DmctlSession("dmctl_qa_")
+
+
+def tearDownModule():
+    _session.close()
 
 
 def run_dmctl(*parts, payload=None, expect_ok=True):
-    cmd = [str(DMCTL), *parts]
-    if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
-
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), check=False)
-
-    try:
-        body = json.loads(result.stdout.strip())
-    except json.JSONDecodeError as exc:
-        raise AssertionError(
-            f"Command did not return JSON.\nCMD: {cmd}\nSTDOUT: {result.stdout}\nSTDERR: {result.stderr}"
-        ) from exc
-
-    if expect_ok and not body.get("ok"):
-        raise AssertionError(
-            f"Command failed unexpectedly.\nCMD: {cmd}\nBODY: {body}\nSTDERR: {result.stderr}"
-        )
-    if not expect_ok and body.get("ok"):
-        raise AssertionError(f"Command unexpectedly succeeded. CMD: {cmd}\nBODY: {body}")
+    return _session.run(*parts, payload=payload, expect_ok=expect_ok)
+
+
+# Fresh interpreter per setting: dmctl reads DMCTL_SQLITE_SYNC once, at import time.
+SYNC_PROBE = """
+import sys
+from pathlib import Path
+sys.path.insert(0, sys.argv[1])
+from dmctl_harness import load_dmctl
+conn = load_dmctl().connect_sqlite(Path(sys.argv[2]))
+print(conn.execute("PRAGMA synchronous").fetchone()[0])
+"""
+
 
-    return body
+def run_repl_session(lines, env):
+    """Feed raw request lines to a one-off dmctl repl and return the decoded replies."""
+    result = subprocess.run(
+        [DMCTL_STR, "repl"], input=b"".join(lines), capture_output=True, cwd=ROOT_STR, env=env, check=False
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"dmctl repl failed.\nSTDERR: {result.stderr.decode(errors='replace')}")
+    return [decode(line) for line in result.stdout.splitlines()]
 
 
 class TestDMCTLQualityGates(unittest.TestCase):
+    """Ordered scenario: each test builds on the campaign left by the one before it."""
+
     @classmethod
     def setUpClass(cls):
         cls.campaign_id = f"qa_{uuid.uuid4().hex[:10]}"
 
-    @classmethod
-    def tearDownClass(cls):
-        cdir = CAMPAIGNS_ROOT / cls.campaign_id
-        if cdir.exists():
-            shutil.rmtree(cdir)
-
     def test_00_create_campaign_and_session_zero_seed(self):
         create = run_dmctl("campaign", "create", "--campaign", self.campaign_id, "--name", "QA Campaign")
         self.assertTrue(create["ok"])
@@ -88,24 +108,17 @@ class TestDMCTLQualityGates(unittest.TestCase):
         )
 
         # At least 3 named NPCs for initial world seed.
-        for name in ["Mayor Elira Thorn", "Sergeant Bram", "Scholar Nyx"]:
-            run_dmctl(
-                "npc",
-                "create",
-                "--campaign",
-                self.campaign_id,
-                payload={
-                    "name": name,
-                    "location_id": "loc_town",
-                    "max_hp": 11,
-                    "current_hp": 11,
-                    "ac": 12,
-                    "trust": 0,
-                    "fear": 0,
-                    "debt": 0,
-                    "reputation": 0,
-                },
-            )
+        names = ["Mayor Elira Thorn", "Sergeant Bram", "Scholar Nyx"]
+        run_dmctl(
+            "batch",
+            "--campaign",
+            self.campaign_id,
+            payload={
+                "commands": [
+                    {"argv": ["npc", "create"], "payload": {"name": name, **SEED_NPC_FIELDS}} for name in names
+                ]
+            },
+        )
 
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Session zero seeded.")
 
@@ -114,99 +127,99 @@ class TestDMCTLQualityGates(unittest.TestCase):
         self.assertGreaterEqual(loaded["data"]["counts"]["npc_count"], 3)
 
     def test_01_ten_turn_simulation(self):
+        ops = []
         for idx in range(10):
-            run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-
-            run_dmctl(
-                "dice",
-                "roll",
-                "--campaign",
-                self.campaign_id,
-                "--formula",
-                "1d20+2",
-                "--context",
-                f"simulation_turn_{idx+1}",
+            ops.append({"argv": ["turn", "begin"]})
+            ops.append(
+                {
+                    "argv": [
+                        "dice",
+                        "roll",
+                        "--formula",
+                        "1d20+2",
+                        "--context",
+                        f"simulation_turn_{idx+1}",
+                    ]
+                }
             )
-
-            run_dmctl(
-                "state",
-                "set",
-                "--campaign",
-                self.campaign_id,
-                payload={
-                    "world_state": {
-                        "world_time": f"{8 + (idx % 10):02d}:00",
-                        "weather": "rain" if idx % 2 else "mist",
+            ops.append(
+                {
+                    "argv": ["state", "set"],
+                    "payload": {
+                        "world_state": {
+                            "world_time": f"{8 + (idx % 10):02d}:00",
+                            "weather": "rain" if idx % 2 else "mist",
+                        },
+                        "public_note": f"Simulation turn {idx+1}",
                     },
-                    "public_note": f"Simulation turn {idx+1}",
-                },
+                }
             )
 
             if idx == 0:
-                run_dmctl(
-                    "quest",
-                    "add",
-                    "--campaign",
-                    self.campaign_id,
-                    payload={
-                        "id": "quest_main_ashen",
-                        "title": "Recover the Ashen Crown",
-                        "description": "Find the stolen relic before the solstice.",
-                        "is_main_arc": True,
-                        "objectives": [
-                            {"id": "obj_clue_1", "description": "Question the town guard."},
-                            {"id": "obj_clue_2", "description": "Search the old granary."},
-                        ],
-                    },
+                ops.append(
+                    {
+                        "argv": ["quest", "add"],
+                        "payload": {
+                            "id": "quest_main_ashen",
+                            "title": "Recover the Ashen Crown",
+                            "description": "Find the stolen relic before the solstice.",
+                            "is_main_arc": True,
+                            "objectives": [
+                                {"id": "obj_clue_1", "description": "Question the town guard."},
+                                {"id": "obj_clue_2", "description": "Search the old granary."},
+                            ],
+                        },
+                    }
                 )
 
             if idx % 3 == 0:
-                run_dmctl(
-                    "clock",
-                    "tick",
-                    "--campaign",
-                    self.campaign_id,
-                    payload={"name": "Bandit retaliation", "max_segments": 6, "amount": 1},
+                ops.append(
+                    {
+                        "argv": ["clock", "tick"],
+                        "payload": {"name": "Bandit retaliation", "max_segments": 6, "amount": 1},
+                    }
                 )
 
             if idx == 1:
-                run_dmctl(
-                    "item",
-                    "grant",
-                    "--campaign",
-                    self.campaign_id,
-                    payload={
-                        "owner_type": "pc",
-                        "owner_id": "pc_hero",
-                        "item_name": "Potion of Healing",
-                        "consumable": True,
-                        "quantity": 2,
-                    },
+                ops.append(
+                    {
+                        "argv": ["item", "grant"],
+                        "payload": {
+                            "owner_type": "pc",
+                            "owner_id": "pc_hero",
+                            "item_name": "Potion of Healing",
+                            "consumable": True,
+                            "quantity": 2,
+                        },
+                    }
                 )
 
             if idx == 2:
-                run_dmctl(
-                    "item",
-                    "consume",
-                    "--campaign",
-                    self.campaign_id,
-                    payload={
-                        "owner_type": "pc",
-                        "owner_id": "pc_hero",
-                        "item_name": "Potion of Healing",
-                        "quantity": 1,
-                    },
+                ops.append(
+                    {
+                        "argv": ["item", "consume"],
+                        "payload": {
+                            "owner_type": "pc",
+                            "owner_id": "pc_hero",
+                            "item_name": "Potion of Healing",
+                            "quantity": 1,
+                        },
+                    }
                 )
 
-            run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", f"Sim turn {idx+1}")
+            ops.append({"argv": ["turn", "commit", "--summary", f"Sim turn {idx+1}"]})
+
+        batch = run_dmctl("batch", "--campaign", self.campaign_id, payload={"commands": ops})
+        self.assertEqual(batch["data"]["count"], len(ops))
 
         loaded = run_dmctl("campaign", "load", "--campaign", self.campaign_id)
         self.assertGreaterEqual(loaded["data"]["latest_turn"]["turn_number"], 11)
 
     def test_02_process_restart_persistence(self):
-        # Each call is a fresh process; this verifies state survives process restart.
-        first = run_dmctl("campaign", "load", "--campaign", self.campaign_id)
-        second = run_dmctl("state", "get", "--campaign", self.campaign_id)
+        # The only test that bypasses the repl worker: each call is a fresh process,
+        # so this verifies state survives process restart.
+        first = _session.run_subprocess("campaign", "load", "--campaign", self.campaign_id)
+        second = _session.run_subprocess("state", "get", "--campaign", self.campaign_id)
         self.assertEqual(first["data"]["campaign"]["id"], self.campaign_id)
         self.assertEqual(second["data"]["campaign"]["id"], self.campaign_id)
         self.assertIn("counts", second["data"])
@@ -270,8 +283,7 @@ class TestDMCTLQualityGates(unittest.TestCase):
         )
 
         encounter_id = started["data"]["encounter_id"]
-        combatants = started["data"]["combatants"]
-        raider_combatant = [c for c in combatants if c["source_type"] == "npc" and c["source_id"] == "npc_raider"][0]
+        raider_combatant_id = started["data"]["combatant_ids"][1]
 
         act = run_dmctl(
             "combat",
@@ -281,7 +293,7 @@ class TestDMCTLQualityGates(unittest.TestCase):
             payload={
                 "encounter_id": encounter_id,
                 "action": "Shortsword strike",
-                "target_id": raider_combatant["id"],
+                "target_id": raider_combatant_id,
                 "damage": 6,
                 "end_turn": True,
             },
@@ -299,8 +311,8 @@ class TestDMCTLQualityGates(unittest.TestCase):
 
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Combat resolved.")
 
-        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--full")
-        raider_rows = [n for n in state["data"]["npcs"] if n["id"] == "npc_raider"]
+        npcs = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--path", "npcs")
+        raider_rows = [n for n in npcs["data"]["value"] if n["id"] == "npc_raider"]
         self.assertEqual(len(raider_rows), 1)
         self.assertLessEqual(raider_rows[0]["current_hp"], 10)
 
@@ -353,17 +365,17 @@ class TestDMCTLQualityGates(unittest.TestCase):
 
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Rumor and secret chain resolved.")
 
-        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--full")
-        rumor_ids = {r["id"] for r in state["data"]["rumors"]}
-        secret_ids = {s["id"] for s in state["data"]["secrets"]}
+        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--path", "rumors,secrets")
+        rumor_ids = {r["id"] for r in state["data"]["values"]["rumors"]}
+        secret_ids = {s["id"] for s in state["data"]["values"]["secrets"]}
         self.assertIn("rumor_ashen_vault", rumor_ids)
         self.assertIn("secret_chapel_key", secret_ids)
 
     def test_05_rollback(self):
         marker_name = f"RollbackTestItem-{uuid.uuid4().hex[:6]}"
 
-        baseline = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--full")
-        before_count = len([i for i in baseline["data"]["inventory"] if i["item_name"] == marker_name])
+        baseline = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--path", "inventory")
+        before_count = len([i for i in baseline["data"]["value"] if i["item_name"] == marker_name])
 
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
         run_dmctl(
@@ -386,8 +398,8 @@ class TestDMCTLQualityGates(unittest.TestCase):
             payload={"reason": "Rollback test"},
         )
 
-        after = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--full")
-        after_count = len([i for i in after["data"]["inventory"] if i["item_name"] == marker_name])
+        after = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--path", "inventory")
+        after_count = len([i for i in after["data"]["value"] if i["item_name"] == marker_name])
         self.assertEqual(before_count, after_count)
 
     def test_06_validate(self):
@@ -396,5 +408,133 @@ class TestDMCTLQualityGates(unittest.TestCase):
         self.assertEqual(validate["data"]["validated_campaigns"], 1)
 
 
+class TestDMCTLReplProtocol(unittest.TestCase):
+    def test_repl_reads_and_writes_utf8_regardless_of_locale(self):
+        campaign_id = f"repl_{uuid.uuid4().hex[:10]}"
+        env = {**_session.env, "PYTHONIOENCODING": "latin-1", "LC_ALL": "C"}
+        create, load = run_repl_session(
+            [
+                encode({"argv": ["campaign", "create", "--campaign", campaign_id, "--name", "Café"]}) + b"\n",
+                encode({"argv": ["campaign", "load", "--campaign", campaign_id]}) + b"\n",
+            ],
+            env,
+        )
+        self.assertEqual(create["data"]["name"], "Café")
+        self.assertEqual(load["data"]["campaign"]["name"], "Café")
+
+    def test_repl_rejects_malformed_requests_and_keeps_serving(self):
+        replies = run_repl_session(
+            [
+                b"not json\n",
+                b"[1, 2]\n",
+                b'{"argv": "campaign list"}\n',
+                b'{"argv": ["campaign", "list"], "payload": [1]}\n',
+                b'{"argv": ["campaign", "list", "--no-such-flag"]}\n',
+                b'{"argv": ["campaign", "list"]}\n',
+            ],
+            _session.env,
+        )
+        self.assertEqual(len(replies), 6)
+        for reply in replies[:4]:
+            self.assertFalse(reply["ok"])
+            self.assertEqual(reply["error"], "invalid_repl_request")
+        self.assertEqual(replies[4]["error"], "invalid_arguments")
+        self.assertTrue(replies[5]["ok"])
+
+
+class TestDMCTLBatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.campaign_id = f"batch_{uuid.uuid4().hex[:10]}"
+        cls.other_campaign_id = f"batch_{uuid.uuid4().hex[:10]}"
+        run_dmctl("campaign", "create", "--campaign", cls.campaign_id)
+        run_dmctl("campaign", "create", "--campaign", cls.other_campaign_id)
+
+    def run_batch(self, commands, expect_ok=True):
+        return run_dmctl("batch", "--campaign", self.campaign_id, payload={"commands": commands}, expect_ok=expect_ok)
+
+    def test_batch_stops_at_first_failure_with_partial_results(self):
+        body = self.run_batch(
+            [
+                {"argv": ["dice", "roll", "--formula", "1d4"]},
+                {"argv": ["dice", "roll", "--formula", "2dd20"]},
+                {"argv": ["dice", "roll", "--formula", "1d6"]},
+            ],
+            expect_ok=False,
+        )
+        self.assertEqual(body["error"], "batch_command_failed")
+        self.assertEqual(body["details"]["index"], 1)
+        self.assertEqual(body["details"]["error"], "invalid_dice_formula")
+        results = body["details"]["results"]
+        self.assertEqual(len(results), 2)
+        self.assertTrue(results[0]["ok"])
+        self.assertFalse(results[1]["ok"])
+
+    def test_batch_rejects_invalid_payloads(self):
+        for commands in ([], [{"payload": {}}], [{"argv": []}], [{"argv": ["campaign", "load"], "payload": [1]}]):
+            body = self.run_batch(commands, expect_ok=False)
+            self.assertEqual(body["error"], "invalid_batch_payload", commands)
+
+    def test_batch_rejects_nested_batch_and_repl(self):
+        nested = (["batch"], ["repl"], ["--campaign", self.campaign_id, "batch"], ["--camp", self.campaign_id, "repl"])
+        for argv in nested:
+            body = self.run_batch([{"argv": ["campaign", "load"]}, {"argv": argv}], expect_ok=False)
+            self.assertEqual(body["error"], "invalid_batch_payload", argv)
+            self.assertEqual(body["details"]["index"], 1, argv)
+
+    def test_batch_keeps_explicit_campaign_in_any_flag_form(self):
+        body = self.run_batch(
+            [
+                {"argv": ["campaign", "load"]},
+                {"argv": ["campaign", "load", "--campaign", self.other_campaign_id]},
+                {"argv": ["campaign", "load", f"--campaign={self.other_campaign_id}"]},
+                {"argv": ["campaign", "load", "--camp", self.other_campaign_id]},
+                {"argv": ["--campaign", self.other_campaign_id, "campaign", "load"]},
+            ]
+        )
+        loaded = [result["data"]["campaign"]["id"] for result in body["data"]["results"]]
+        self.assertEqual(loaded, [self.campaign_id, *[self.other_campaign_id] * 4])
+
+    def test_payload_can_be_read_from_stdin_in_both_flag_forms(self):
+        payload = encode({"commands": [{"argv": ["campaign", "load"]}]})
+        for flag in (["--payload", "-"], ["--payload=-"]):
+            result = subprocess.run(
+                [DMCTL_STR, "batch", "--campaign", self.campaign_id, *flag],
+                input=payload,
+                capture_output=True,
+                cwd=ROOT_STR,
+                env=_session.env,
+                check=False,
+            )
+            body = decode(result.stdout)
+            self.assertTrue(body["ok"], body)
+            self.assertEqual(body["data"]["results"][0]["data"]["campaign"]["id"], self.campaign_id)
+
+
+class TestDMCTLSqliteSync(unittest.TestCase):
+    def probe_synchronous(self, setting):
+        env = {key: value for key, value in _session.env.items() if key != "DMCTL_SQLITE_SYNC"}
+        if setting is not None:
+            env["DMCTL_SQLITE_SYNC"] = setting
+        db_path = _session.scratch_root / f"sync_{uuid.uuid4().hex[:8]}.db"
+        result = subprocess.run(
+            [sys.executable, "-c", SYNC_PROBE, str(ROOT / "tests"), str(db_path)],
+            capture_output=True,
+            cwd=ROOT_STR,
+            env=env,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise AssertionError(f"sync probe failed.\nSTDERR: {result.stderr.decode(errors='replace')}")
+        return int(result.stdout)
+
+    def test_connections_apply_dmctl_sqlite_sync(self):
+        # PRAGMA synchronous reports OFF=0, NORMAL=1, FULL=2, EXTRA=3.
+        cases = ((None, 2), ("OFF", 0), ("normal", 1), ("EXTRA", 3), ("sometimes", 2), ("", 2))
+        for setting, expected in cases:
+            with self.subTest(setting=setting):
+                self.assertEqual(self.probe_synchronous(setting), expected)
+
+
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -1,90 +1,79 @@
-import json
+import secrets
 import sqlite3
-import shutil
-import subprocess
+import sys
 import unittest
-import uuid
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
+
+sys.path.insert(0, str(ROOT / "tests"))
+from dmctl_harness import SEED_PAYLOAD, DmctlSession  # noqa: E402
+
+_session = None
+
+
+def setUpModule():
+    global _session
+    _session = DmctlSession("dmctl_eng_")
+
+
+def tearDownModule():
+    _session.close()
 
 
 def run_dmctl(*parts, payload=None, expect_ok=True):
-    cmd = [str(DMCTL), *parts]
-    if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), check=False)
-    try:
-        body = json.loads(result.stdout.strip())
-    except json.JSONDecodeError as exc:
-        raise AssertionError(f"Non-JSON response: cmd={cmd} stdout={result.stdout} stderr={result.stderr}") from exc
-    if expect_ok and not body.get("ok"):
-        raise AssertionError(f"Unexpected failure: cmd={cmd} body={body} stderr={result.stderr}")
-    if not expect_ok and body.get("ok"):
-        raise AssertionError(f"Unexpected success: cmd={cmd} body={body}")
-    return body
-
-
-def roll_log_count(campaign_id: str) -> int:
-    db_path = CAMPAIGNS_ROOT / campaign_id / "campaign.db"
-    conn = sqlite3.connect(db_path)
-    try:
-        row = conn.execute("SELECT COUNT(*) FROM roll_log").fetchone()
-        return int(row[0] if row else 0)
-    finally:
+    return _session.run(*parts, payload=payload, expect_ok=expect_ok)
+
+
+_ROLL_LOG_CONNECTIONS = {}
+
+
+def roll_log_watermark(campaign_id: str) -> int:
+    # Highest roll_log rowid: an index probe rather than a table scan. Rows are only
+    # appended during a test, so it moves exactly when new rolls are persisted.
+    conn = _ROLL_LOG_CONNECTIONS.get(campaign_id)
+    if conn is None:
+        db_path = _session.campaigns_root / campaign_id / "campaign.db"
+        conn = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+        _ROLL_LOG_CONNECTIONS[campaign_id] = conn
+    row = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM roll_log").fetchone()
+    return int(row[0] if row else 0)
+
+
+def close_roll_log_connection(campaign_id: str) -> None:
+    conn = _ROLL_LOG_CONNECTIONS.pop(campaign_id, None)
+    if conn is not None:
         conn.close()
 
 
 class TestDMCTLEngagementV3(unittest.TestCase):
-    def setUp(self):
-        self.campaign_id = f"eng_{uuid.uuid4().hex[:10]}"
-        run_dmctl("campaign", "create", "--campaign", self.campaign_id, "--name", "Engagement V3")
-        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
+    """Each test restores a fresh copy of the baseline campaign; tests are independent of order and process."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.campaign_id = f"eng_{secrets.token_hex(5)}"
+        # Baseline world: create, begin, seed and commit as one batch round trip.
         run_dmctl(
-            "campaign",
-            "seed",
+            "batch",
             "--campaign",
-            self.campaign_id,
+            cls.campaign_id,
             payload={
-                "locations": [
-                    {"id": "loc_start", "name": "Larkspur", "region": "Greenmarch"},
-                    {"id": "loc_keep", "name": "Old Keep", "region": "Greenmarch"},
-                ],
-                "player_characters": [
-                    {
-                        "id": "pc_hero",
-                        "name": "Arin Vale",
-                        "class": "Rogue",
-                        "level": 3,
-                        "max_hp": 24,
-                        "current_hp": 24,
-                        "ac": 15,
-                        "location_id": "loc_start",
-                        "initiative_mod": 3,
-                    }
-                ],
-                "npcs": [
-                    {"id": "npc_mayor", "name": "Mayor Elira Thorn", "location_id": "loc_start", "max_hp": 11, "current_hp": 11, "ac": 12},
-                    {"id": "npc_sergeant", "name": "Sergeant Bram", "location_id": "loc_start", "max_hp": 12, "current_hp": 12, "ac": 13},
-                    {"id": "npc_scholar", "name": "Scholar Nyx", "location_id": "loc_start", "max_hp": 9, "current_hp": 9, "ac": 11},
-                ],
-                "world_state": {
-                    "world_date": "2 Ches 1492 DR",
-                    "world_time": "10:00",
-                    "weather": "clear",
-                    "region": "Greenmarch",
-                    "location_id": "loc_start",
-                },
+                "commands": [
+                    {"argv": ["campaign", "create", "--name", "Engagement V3"]},
+                    {"argv": ["turn", "begin"]},
+                    {"argv": ["campaign", "seed"], "payload": SEED_PAYLOAD},
+                    {"argv": ["turn", "commit", "--summary", "Engagement baseline"]},
+                ]
             },
         )
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Engagement baseline")
+        cls.template = _session.snapshot(cls.campaign_id)
+
+    def setUp(self):
+        _session.restore(self.template)
 
     def tearDown(self):
-        cdir = CAMPAIGNS_ROOT / self.campaign_id
-        if cdir.exists():
-            shutil.rmtree(cdir)
+        close_roll_log_connection(self.campaign_id)
+        _session.discard_campaign(self.campaign_id)
 
     def test_00_agenda_cadence_idempotent(self):
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
@@ -123,9 +112,10 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             "--campaign",
             self.campaign_id,
             "--include-hidden",
-            payload={"full": True},
+            "--path",
+            "clocks",
         )
-        clocks = [c for c in state["data"]["clocks"] if c["name"] == "Bandit Escalation Clock"]
+        clocks = [c for c in state["data"]["value"] if c["name"] == "Bandit Escalation Clock"]
         self.assertEqual(len(clocks), 1)
         self.assertEqual(clocks[0]["current_segments"], 2)
 
@@ -136,9 +126,10 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             "--campaign",
             self.campaign_id,
             "--include-hidden",
-            payload={"full": True},
+            "--path",
+            "players",
         )
-        hero_before = [pc for pc in baseline["data"]["players"] if pc["id"] == "pc_hero"][0]
+        hero_before = [pc for pc in baseline["data"]["value"] if pc["id"] == "pc_hero"][0]
         money_before = hero_before["money_cp"]
 
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
@@ -161,20 +152,22 @@ class TestDMCTLEngagementV3(unittest.TestCase):
         )
         self.assertEqual(failed["error"], "faction_not_found")
 
-        state = run_dmctl(
-            "state",
-            "get",
+        checks = run_dmctl(
+            "batch",
             "--campaign",
             self.campaign_id,
-            "--include-hidden",
-            payload={"full": True},
+            payload={
+                "commands": [
+                    {"argv": ["state", "get", "--include-hidden", "--path", "players"]},
+                    {"argv": ["reward", "history"], "payload": {"limit": 20}},
+                    {"argv": ["turn", "rollback"], "payload": {"reason": "reward atomicity"}},
+                ]
+            },
         )
-        hero_after = [pc for pc in state["data"]["players"] if pc["id"] == "pc_hero"][0]
+        state, history, _ = checks["data"]["results"]
+        hero_after = [pc for pc in state["data"]["value"] if pc["id"] == "pc_hero"][0]
         self.assertEqual(hero_after["money_cp"], money_before)
-
-        history = run_dmctl("reward", "history", "--campaign", self.campaign_id, payload={"limit": 20})
         self.assertEqual(history["data"]["count"], 0)
-        run_dmctl("turn", "rollback", "--campaign", self.campaign_id, payload={"reason": "reward atomicity"})
 
     def test_02_quest_auto_grant(self):
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
@@ -205,20 +198,23 @@ class TestDMCTLEngagementV3(unittest.TestCase):
         )
         self.assertEqual(updated["data"]["quest"]["status"], "completed")
         self.assertEqual(len(updated["data"]["auto_granted_rewards"]), 1)
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Quest reward auto-grant")
 
-        state = run_dmctl(
-            "state",
-            "get",
+        checks = run_dmctl(
+            "batch",
             "--campaign",
             self.campaign_id,
-            "--include-hidden",
-            payload={"full": True},
+            payload={
+                "commands": [
+                    {"argv": ["turn", "commit", "--summary", "Quest reward auto-grant"]},
+                    {"argv": ["state", "get", "--include-hidden", "--path", "players"]},
+                    {"argv": ["reward", "history"]},
+                ]
+            },
         )
-        hero = [pc for pc in state["data"]["players"] if pc["id"] == "pc_hero"][0]
+        _, state, history = checks["data"]["results"]
+        hero = [pc for pc in state["data"]["value"] if pc["id"] == "pc_hero"][0]
         self.assertEqual(hero["xp_total"], 120)
         self.assertEqual(hero["money_cp"], 35)
-        history = run_dmctl("reward", "history", "--campaign", self.campaign_id)
         self.assertGreaterEqual(history["data"]["count"], 1)
 
     def test_03_combat_resolve_attack_and_save(self):
@@ -250,7 +246,7 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             },
         )
         encounter_id = start["data"]["encounter_id"]
-        target = [c for c in start["data"]["combatants"] if c["source_type"] == "npc"][0]["id"]
+        target = start["data"]["combatant_ids"][1]
 
         attack = run_dmctl(
             "combat",
@@ -312,9 +308,10 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             "--campaign",
             self.campaign_id,
             "--include-hidden",
-            payload={"full": True},
+            "--path",
+            "players",
         )
-        hero = [pc for pc in state["data"]["players"] if pc["id"] == "pc_hero"][0]
+        hero = [pc for pc in state["data"]["value"] if pc["id"] == "pc_hero"][0]
         self.assertEqual(hero["exhaustion"], 1)
 
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
@@ -363,9 +360,9 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             },
         )
         encounter_id = start["data"]["encounter_id"]
-        target = [c for c in start["data"]["combatants"] if c["source_type"] == "npc"][0]["id"]
+        target = start["data"]["combatant_ids"][1]
 
-        initial_count = roll_log_count(self.campaign_id)
+        initial_mark = roll_log_watermark(self.campaign_id)
         first = run_dmctl(
             "combat",
             "resolve",
@@ -382,8 +379,8 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             },
         )
         self.assertEqual(first["data"]["resolution"]["mode"], "attack")
-        after_first = roll_log_count(self.campaign_id)
-        self.assertGreater(after_first, initial_count)
+        after_first = roll_log_watermark(self.campaign_id)
+        self.assertGreater(after_first, initial_mark)
 
         failed = run_dmctl(
             "combat",
@@ -402,7 +399,7 @@ class TestDMCTLEngagementV3(unittest.TestCase):
             expect_ok=False,
         )
         self.assertEqual(failed["error"], "action_already_used")
-        after_failed = roll_log_count(self.campaign_id)
+        after_failed = roll_log_watermark(self.campaign_id)
         self.assertEqual(after_failed, after_first)
         run_dmctl("turn", "rollback", "--campaign", self.campaign_id, payload={"reason": "combat resolve rejection roll log"})
 
@@ -447,6 +444,31 @@ class TestDMCTLEngagementV3(unittest.TestCase):
         ooc_time = run_dmctl("ooc", "time", "--campaign", self.campaign_id)
         self.assertEqual(ooc_time["data"]["time"]["world_date"], "11 Tarsakh 1492 DR")
 
+    def test_08_combat_start_returns_every_combatant_id(self):
+        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
+        participants = [
+            {"name": "Goblin A", "max_hp": 7, "ac": 13},
+            {"name": "Goblin B", "max_hp": 7, "ac": 13},
+            {"type": "summon", "name": "Spirit Wolf", "max_hp": 11, "ac": 12},
+            {"type": "npc", "id": "npc_mayor"},
+            {"type": "npc", "id": "npc_mayor"},
+        ]
+        start = run_dmctl(
+            "combat",
+            "start",
+            "--campaign",
+            self.campaign_id,
+            payload={"name": "Crowded Ambush", "location_id": "loc_start", "participants": participants},
+        )
+
+        combatant_ids = start["data"]["combatant_ids"]
+        self.assertEqual(len(combatant_ids), len(participants))
+        self.assertEqual(len(set(combatant_ids)), len(participants))
+        by_id = {row["id"]: row for row in start["data"]["combatants"]}
+        self.assertEqual(set(combatant_ids), set(by_id))
+        self.assertEqual([by_id[cid]["name"] for cid in combatant_ids[:3]], ["Goblin A", "Goblin B", "Spirit Wolf"])
+        self.assertEqual([by_id[cid]["source_id"] for cid in combatant_ids[3:]], ["npc_mayor", "npc_mayor"])
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -1,84 +1,57 @@
 import json
-import shutil
 import sqlite3
-import subprocess
+import sys
 import unittest
 import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
 
+sys.path.insert(0, str(ROOT / "tests"))
+from dmctl_harness import SEED_PAYLOAD, DmctlSession  # noqa: E402
+
+_session = None
 
-def run_dmctl(*parts, payload=None, expect_ok=True):
-    cmd = [str(DMCTL), *parts]
-    if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
 
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), check=False)
-    try:
-        body = json.loads(result.stdout.strip())
-    except json.JSONDecodeError as exc:
-        raise AssertionError(
-            f"Command did not return JSON. CMD={cmd} STDOUT={result.stdout} STDERR={result.stderr}"
-        ) from exc
+def setUpModule():
+    global _session
+    _session = DmctlSession("dmctl_feat_")
 
-    if expect_ok and not body.get("ok"):
-        raise AssertionError(f"Command failed unexpectedly. CMD={cmd} BODY={body} STDERR={result.stderr}")
-    if not expect_ok and body.get("ok"):
-        raise AssertionError(f"Command unexpectedly succeeded. CMD={cmd} BODY={body}")
-    return body
+
+def tearDownModule():
+    _session.close()
+
+
+def run_dmctl(*parts, payload=None, expect_ok=True):
+    return _session.run(*parts, payload=payload, expect_ok=expect_ok)
 
 
 class TestDMCTLFeaturesV2(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.campaign_id = f"feat_{uuid.uuid4().hex[:10]}"
+        run_dmctl("campaign", "create", "--campaign", cls.campaign_id, "--name", "Features V2")
+        run_dmctl("turn", "begin", "--campaign", cls.campaign_id)
+        run_dmctl("campaign", "seed", "--campaign", cls.campaign_id, payload=SEED_PAYLOAD)
+        run_dmctl("turn", "commit", "--campaign", cls.campaign_id, "--summary", "Feature baseline")
+        cls.template = _session.snapshot(cls.campaign_id)
+
     def setUp(self):
-        self.campaign_id = f"feat_{uuid.uuid4().hex[:10]}"
-        run_dmctl("campaign", "create", "--campaign", self.campaign_id, "--name", "Features V2")
-        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-        run_dmctl(
-            "campaign",
-            "seed",
-            "--campaign",
-            self.campaign_id,
-            payload={
-                "locations": [
-                    {"id": "loc_start", "name": "Larkspur", "region": "Greenmarch"},
-                    {"id": "loc_keep", "name": "Old Keep", "region": "Greenmarch"},
-                ],
-                "player_characters": [
-                    {
-                        "id": "pc_hero",
-                        "name": "Arin Vale",
-                        "class": "Rogue",
-                        "level": 3,
-                        "max_hp": 24,
-                        "current_hp": 24,
-                        "ac": 15,
-                        "location_id": "loc_start",
-                        "initiative_mod": 3,
-                    }
-                ],
-                "npcs": [
-                    {"id": "npc_mayor", "name": "Mayor Elira Thorn", "location_id": "loc_start", "max_hp": 11, "current_hp": 11, "ac": 12},
-                    {"id": "npc_sergeant", "name": "Sergeant Bram", "location_id": "loc_start", "max_hp": 12, "current_hp": 12, "ac": 13},
-                    {"id": "npc_scholar", "name": "Scholar Nyx", "location_id": "loc_start", "max_hp": 9, "current_hp": 9, "ac": 11},
-                ],
-                "world_state": {
-                    "world_date": "2 Ches 1492 DR",
-                    "world_time": "10:00",
-                    "weather": "clear",
-                    "region": "Greenmarch",
-                    "location_id": "loc_start",
-                },
-            },
-        )
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Feature baseline")
+        _session.restore(self.template)
+        self._conn = None
 
     def tearDown(self):
-        cdir = CAMPAIGNS_ROOT / self.campaign_id
-        if cdir.exists():
-            shutil.rmtree(cdir)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        _session.discard_campaign(self.campaign_id)
+
+    def db(self):
+        # One connection per test for direct peeks at campaign.db; dmctl keeps its own.
+        if self._conn is None:
+            self._conn = sqlite3.connect(_session.campaigns_root / self.campaign_id / "campaign.db")
+        return self._conn
 
     def test_00_dice_expression_and_flags(self):
         expr = run_dmctl(
@@ -160,16 +133,16 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
             payload={"rumor_id": "rumor_linked"},
         )
 
-        conn = sqlite3.connect(CAMPAIGNS_ROOT / self.campaign_id / "campaign.db")
-        conn.execute(
-            """
-            INSERT INTO rumor_links (id, campaign_id, rumor_id, secret_id, min_spread_level, auto_reveal, created_at, updated_at)
-            VALUES (?, ?, ?, ?, 1, 1, datetime('now'), datetime('now'))
-            """,
-            (f"link_{uuid.uuid4().hex[:8]}", self.campaign_id, "rumor_linked", "secret_linked"),
-        )
-        conn.commit()
-        conn.close()
+        ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+        conn = self.db()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO rumor_links (id, campaign_id, rumor_id, secret_id, min_spread_level, auto_reveal, created_at, updated_at)
+                VALUES (?, ?, ?, ?, 1, 1, ?, ?)
+                """,
+                (f"link_{uuid.uuid4().hex[:8]}", self.campaign_id, "rumor_linked", "secret_linked", ts, ts),
+            )
 
         pulse = run_dmctl(
             "world",
@@ -182,8 +155,8 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
 
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Pulse and reveal")
         state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--full")
-        secret_rows = [s for s in state["data"]["secrets"] if s["id"] == "secret_linked"]
-        self.assertEqual(secret_rows[0]["reveal_status"], "revealed")
+        secret = next(row for row in state["data"]["secrets"] if row["id"] == "secret_linked")
+        self.assertEqual(secret["reveal_status"], "revealed")
 
     def test_02_rest_travel_spell_and_ooc(self):
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
@@ -251,39 +224,49 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
 
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Rest travel spell")
 
-        sheet = run_dmctl("ooc", "sheet", "--campaign", self.campaign_id, payload={"pc_id": "pc_hero"})
+        # The post-commit views are all read-only, so fetch them in one round trip.
+        views = run_dmctl(
+            "batch",
+            "--campaign",
+            self.campaign_id,
+            payload={
+                "commands": [
+                    {"argv": ["ooc", "sheet"], "payload": {"pc_id": "pc_hero"}},
+                    {"argv": ["ooc", "time"]},
+                    {"argv": ["ooc", "map"]},
+                    {"argv": ["ooc", "state"]},
+                    {"argv": ["state", "get", "--path", "world_state,players"]},
+                    {"argv": ["ooc", "dashboard"]},
+                    {"argv": ["ooc", "dashboard", "--full"]},
+                    {"argv": ["ooc", "recap"]},
+                    {"argv": ["ooc", "recap", "--full"]},
+                ]
+            },
+        )
+        results = views["data"]["results"]
+        sheet, ooc_time, ooc_map, ooc_state, state_paths = results[:5]
+        dashboard, dashboard_full, recap, recap_full = results[5:]
         self.assertEqual(sheet["data"]["pc"]["id"], "pc_hero")
-
-        ooc_time = run_dmctl("ooc", "time", "--campaign", self.campaign_id)
         self.assertIn("world_time", ooc_time["data"]["time"])
-
-        ooc_map = run_dmctl("ooc", "map", "--campaign", self.campaign_id)
         self.assertEqual(ooc_map["data"]["current_location"]["location_id"], "loc_keep")
-
-        ooc_state = run_dmctl("ooc", "state", "--campaign", self.campaign_id)
         self.assertEqual(ooc_state["data"]["profile"], "player")
         self.assertNotIn("recent_hidden_notes", ooc_state["data"])
 
-        state_paths = run_dmctl("state", "get", "--campaign", self.campaign_id, "--path", "world_state,players")
         self.assertEqual(state_paths["data"]["paths"], ["world_state", "players"])
         self.assertIn("world_state", state_paths["data"]["values"])
         self.assertIn("players", state_paths["data"]["values"])
 
-        dashboard = run_dmctl("ooc", "dashboard", "--campaign", self.campaign_id)
         if dashboard["data"]["latest_turn_diff"]:
             self.assertIn("diff_summary", dashboard["data"]["latest_turn_diff"])
             self.assertNotIn("diff", dashboard["data"]["latest_turn_diff"])
 
-        dashboard_full = run_dmctl("ooc", "dashboard", "--campaign", self.campaign_id, "--full")
         if dashboard_full["data"]["latest_turn_diff"]:
             self.assertIn("diff", dashboard_full["data"]["latest_turn_diff"])
 
-        recap = run_dmctl("ooc", "recap", "--campaign", self.campaign_id)
         if recap["data"]["recent_turn_diffs"]:
             self.assertIn("diff_summary", recap["data"]["recent_turn_diffs"][0])
             self.assertNotIn("diff", recap["data"]["recent_turn_diffs"][0])
 
-        recap_full = run_dmctl("ooc", "recap", "--campaign", self.campaign_id, "--full")
         if recap_full["data"]["recent_turn_diffs"]:
             self.assertIn("diff", recap_full["data"]["recent_turn_diffs"][0])
 
@@ -312,9 +295,7 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         self.assertNotIn(marker, names)
 
     def test_04_help_returns_json(self):
-        result = subprocess.run([str(DMCTL), "--help"], capture_output=True, text=True, cwd=str(ROOT), check=False)
-        body = json.loads(result.stdout.strip())
-        self.assertTrue(body["ok"])
+        body = _session.run_subprocess("--help")
         self.assertEqual(body["command"], "help")
         self.assertIn("groups", body["data"])
         self.assertGreater(len(body["data"]["groups"]), 0)
@@ -324,15 +305,7 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         self.assertEqual(campaign_help["data"]["requested_group"], "campaign")
         self.assertIn("create", campaign_help["data"]["requested_actions"])
 
-        prefixed_help = subprocess.run(
-            [str(DMCTL), "--campaign", "demo", "campaign", "--help"],
-            capture_output=True,
-            text=True,
-            cwd=str(ROOT),
-            check=False,
-        )
-        prefixed_body = json.loads(prefixed_help.stdout.strip())
-        self.assertTrue(prefixed_body["ok"])
+        prefixed_body = _session.run_subprocess("--campaign", "demo", "campaign", "--help")
         self.assertEqual(prefixed_body["data"]["requested_group"], "campaign")
 
         ooc_help = run_dmctl("ooc", "--help")
@@ -355,8 +328,8 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         )
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Add marker for committed undo")
 
-        pre_undo = run_dmctl("state", "get", "--campaign", self.campaign_id, "--full")
-        names_before = {row["item_name"] for row in pre_undo["data"]["inventory"]}
+        pre_undo = run_dmctl("state", "get", "--campaign", self.campaign_id, "--path", "inventory")
+        names_before = {row["item_name"] for row in pre_undo["data"]["value"]}
         self.assertIn(marker, names_before)
 
         undo = run_dmctl("ooc", "undo_last_turn", "--campaign", self.campaign_id)
@@ -390,8 +363,8 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         )
         self.assertEqual(undo_with_reason["data"]["turn"]["reason"], custom_reason)
 
-        post_undo = run_dmctl("state", "get", "--campaign", self.campaign_id, "--full")
-        names_after = {row["item_name"] for row in post_undo["data"]["inventory"]}
+        post_undo = run_dmctl("state", "get", "--campaign", self.campaign_id, "--path", "inventory")
+        names_after = {row["item_name"] for row in post_undo["data"]["value"]}
         self.assertNotIn(marker, names_after)
         self.assertNotIn(f"{marker}-2", names_after)
 
@@ -402,23 +375,18 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         self.assertTrue(validate["ok"])
 
     def test_06_dashboard_and_recap_use_latest_turn_order(self):
+        commands = []
         for idx in range(2):
-            run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-            run_dmctl(
-                "world",
-                "pulse",
-                "--campaign",
-                self.campaign_id,
-                payload={"hours": 0, "add_hooks": [f"hook_{idx}"]},
-            )
-            run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", f"Ordering turn {idx}")
-
-        db_path = CAMPAIGNS_ROOT / self.campaign_id / "campaign.db"
-        conn = sqlite3.connect(db_path)
-        latest_turn_number = conn.execute(
+            commands += [
+                {"argv": ["turn", "begin"]},
+                {"argv": ["world", "pulse"], "payload": {"hours": 0, "add_hooks": [f"hook_{idx}"]}},
+                {"argv": ["turn", "commit", "--summary", f"Ordering turn {idx}"]},
+            ]
+        run_dmctl("batch", "--campaign", self.campaign_id, payload={"commands": commands})
+
+        latest_turn_number = self.db().execute(
             "SELECT MAX(turn_number) FROM turns WHERE status = 'committed'"
         ).fetchone()[0]
-        conn.close()
 
         dashboard = run_dmctl("ooc", "dashboard", "--campaign", self.campaign_id)
         self.assertEqual(dashboard["data"]["latest_turn_diff"]["turn_number"], latest_turn_number)
@@ -490,16 +458,14 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         self.assertIn("state_snapshot", packet)
 
     def test_09_refresh_recent_turn_diffs_use_latest_turn_order(self):
+        commands = []
         for idx in range(2):
-            run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-            run_dmctl(
-                "world",
-                "pulse",
-                "--campaign",
-                self.campaign_id,
-                payload={"hours": 0, "add_hooks": [f"refresh_order_hook_{idx}"]},
-            )
-            run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", f"Refresh order turn {idx}")
+            commands += [
+                {"argv": ["turn", "begin"]},
+                {"argv": ["world", "pulse"], "payload": {"hours": 0, "add_hooks": [f"refresh_order_hook_{idx}"]}},
+                {"argv": ["turn", "commit", "--summary", f"Refresh order turn {idx}"]},
+            ]
+        run_dmctl("batch", "--campaign", self.campaign_id, payload={"commands": commands})
 
         dashboard = run_dmctl("ooc", "dashboard", "--campaign", self.campaign_id)
         latest_turn_number = dashboard["data"]["latest_turn_diff"]["turn_number"]
@@ -578,7 +544,7 @@ class TestDMCTLFeaturesV2(unittest.TestCase):
         self.assertIn(dm_hook, refresh["data"]["memory_packet"]["next_payoff_hooks"])
 
     def test_12_turn_begin_and_load_skip_event_log_parity_scan(self):
-        events_path = CAMPAIGNS_ROOT / self.campaign_id / "events.ndjson"
+        events_path = _session.campaigns_root / self.campaign_id / "events.ndjson"
         with events_path.open("a", encoding="utf-8") as handle:
             handle.write("not-json\n")
 
@@ -11,6 +11,43 @@ SCHEMA_SQL = ROOT / "tools" / "dm" / "schema.sql"
 DMCTL = ROOT / "tools" / "dmctl"
 CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
 
+SCHEMA_TEXT = SCHEMA_SQL.read_text(encoding="utf-8")
+SCHEMA_TOKENS = (
+    "CREATE TABLE IF NOT EXISTS applied_migrations",
+    "CREATE TABLE IF NOT EXISTS turn_diffs",
+    "CREATE TABLE IF NOT EXISTS agenda_rules",
+    "CREATE TABLE IF NOT EXISTS knowledge_facts",
+    "CREATE TABLE IF NOT EXISTS reward_events",
+    "CREATE TABLE IF NOT EXISTS rumor_links",
+    "stage TEXT NOT NULL DEFAULT 'committed'",
+    "checkpoint_checksum",
+    "action_used INTEGER NOT NULL DEFAULT 0",
+    "world_day_index INTEGER NOT NULL DEFAULT 0",
+    "xp_total INTEGER NOT NULL DEFAULT 0",
+    "reward_json TEXT NOT NULL DEFAULT '{}'",
+    "CREATE TABLE IF NOT EXISTS location_discoveries",
+    "CREATE TABLE IF NOT EXISTS npcs",
+    "char_class TEXT NOT NULL DEFAULT ''",
+    "prepared_spells_json TEXT NOT NULL DEFAULT '[]'",
+    "policy_decision TEXT NOT NULL DEFAULT ''",
+    "reason_codes_json TEXT NOT NULL DEFAULT '[]'",
+)
+EXPECTED_TABLES = frozenset(
+    {
+        "applied_migrations",
+        "campaigns",
+        "turns",
+        "events",
+        "turn_diffs",
+        "agenda_rules",
+        "knowledge_facts",
+        "reward_events",
+        "rumor_links",
+        "combatants",
+        "location_discoveries",
+    }
+)
+
 
 class TestDMCTLMigrationsV2(unittest.TestCase):
     def test_migration_files_monotonic(self):
@@ -28,54 +65,21 @@ class TestDMCTLMigrationsV2(unittest.TestCase):
         )
 
     def test_schema_contains_v2_tables(self):
-        sql = SCHEMA_SQL.read_text(encoding="utf-8")
-        for token in [
-            "CREATE TABLE IF NOT EXISTS applied_migrations",
-            "CREATE TABLE IF NOT EXISTS turn_diffs",
-            "CREATE TABLE IF NOT EXISTS agenda_rules",
-            "CREATE TABLE IF NOT EXISTS knowledge_facts",
-            "CREATE TABLE IF NOT EXISTS reward_events",
-            "CREATE TABLE IF NOT EXISTS rumor_links",
-            "stage TEXT NOT NULL DEFAULT 'committed'",
-            "checkpoint_checksum",
-            "action_used INTEGER NOT NULL DEFAULT 0",
-            "world_day_index INTEGER NOT NULL DEFAULT 0",
-            "xp_total INTEGER NOT NULL DEFAULT 0",
-            "reward_json TEXT NOT NULL DEFAULT '{}'",
-            "CREATE TABLE IF NOT EXISTS location_discoveries",
-            "CREATE TABLE IF NOT EXISTS npcs",
-            "char_class TEXT NOT NULL DEFAULT ''",
-            "prepared_spells_json TEXT NOT NULL DEFAULT '[]'",
-            "policy_decision TEXT NOT NULL DEFAULT ''",
-            "reason_codes_json TEXT NOT NULL DEFAULT '[]'",
-        ]:
-            self.assertIn(token, sql)
+        missing = [token for token in SCHEMA_TOKENS if token not in SCHEMA_TEXT]
+        self.assertFalse(missing, f"schema.sql is missing: {missing}")
 
     def test_fresh_schema_matches_expected_tables(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             db_path = Path(tmpdir) / "schema.db"
             conn = sqlite3.connect(db_path)
-            conn.executescript(SCHEMA_SQL.read_text(encoding="utf-8"))
+            conn.executescript(SCHEMA_TEXT)
             tables = {
                 row[0]
                 for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
             }
             conn.close()
 
-        expected = {
-            "applied_migrations",
-            "campaigns",
-            "turns",
-            "events",
-            "turn_diffs",
-            "agenda_rules",
-            "knowledge_facts",
-            "reward_events",
-            "rumor_links",
-            "combatants",
-            "location_discoveries",
-        }
-        self.assertTrue(expected.issubset(tables))
+        self.assertTrue(EXPECTED_TABLES.issubset(tables))
 
 
 if __name__ == "__main__":
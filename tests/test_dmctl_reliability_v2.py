@@ -1,175 +1,156 @@
 import json
-import shutil
+import secrets
 import sqlite3
-import subprocess
+import sys
 import unittest
-import uuid
+from itertools import zip_longest
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
+
+sys.path.insert(0, str(ROOT / "tests"))
+from dmctl_harness import SEED_PAYLOAD, DmctlSession, decode, load_dmctl  # noqa: E402
+
 FIXTURE_PATH = ROOT / "tests" / "fixtures" / "compatibility_outputs.json"
+FIXTURE = json.loads(FIXTURE_PATH.read_bytes())
 
+REQUIRED_DIFF_KEYS = frozenset(
+    {
+        "time_advanced",
+        "location_change",
+        "hp_resources_changed",
+        "inventory_currency_changed",
+        "relationship_reputation_changed",
+        "quest_rumor_clock_updates",
+    }
+)
+REQUIRED_MIGRATIONS = frozenset(
+    {
+        "001_init.sql",
+        "002_reliability_core.sql",
+        "003_engagement_rewards.sql",
+        "004_player_views.sql",
+        "005_npc_full_stat_blocks.sql",
+        "006_roll_policy_v1.sql",
+    }
+)
+
+_session = None
+
+
+def setUpModule():
+    global _session
+    _session = DmctlSession("dmctl_rel_")
 
-def run_dmctl(*parts, payload=None, expect_ok=True):
-    cmd = [str(DMCTL), *parts]
-    if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
 
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), check=False)
-    try:
-        body = json.loads(result.stdout.strip())
-    except json.JSONDecodeError as exc:
-        raise AssertionError(
-            f"Command did not return JSON. CMD={cmd} STDOUT={result.stdout} STDERR={result.stderr}"
-        ) from exc
+def tearDownModule():
+    _session.close()
 
-    if expect_ok and not body.get("ok"):
-        raise AssertionError(f"Command failed unexpectedly. CMD={cmd} BODY={body} STDERR={result.stderr}")
-    if not expect_ok and body.get("ok"):
-        raise AssertionError(f"Command unexpectedly succeeded. CMD={cmd} BODY={body}")
-    return body
+
+def run_dmctl(*parts, payload=None, expect_ok=True):
+    return _session.run(*parts, payload=payload, expect_ok=expect_ok)
 
 
 class TestDMCTLReliabilityV2(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.campaign_id = f"rel_{secrets.token_hex(5)}"
+        run_dmctl("campaign", "create", "--campaign", cls.campaign_id, "--name", "Reliability V2")
+        _session.run_turn(cls.campaign_id, [{"argv": ["campaign", "seed"], "payload": SEED_PAYLOAD}], "Session zero seed")
+        cls.template = _session.snapshot(cls.campaign_id)
+
     def setUp(self):
-        self.campaign_id = f"rel_{uuid.uuid4().hex[:10]}"
-        run_dmctl("campaign", "create", "--campaign", self.campaign_id, "--name", "Reliability V2")
-        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-        run_dmctl(
-            "campaign",
-            "seed",
-            "--campaign",
-            self.campaign_id,
-            payload={
-                "locations": [
-                    {"id": "loc_start", "name": "Larkspur", "region": "Greenmarch"},
-                    {"id": "loc_keep", "name": "Old Keep", "region": "Greenmarch"},
-                ],
-                "player_characters": [
-                    {
-                        "id": "pc_hero",
-                        "name": "Arin Vale",
-                        "class": "Rogue",
-                        "level": 3,
-                        "max_hp": 24,
-                        "current_hp": 24,
-                        "ac": 15,
-                        "location_id": "loc_start",
-                        "initiative_mod": 3,
-                    }
-                ],
-                "npcs": [
-                    {"id": "npc_mayor", "name": "Mayor Elira Thorn", "location_id": "loc_start", "max_hp": 11, "current_hp": 11, "ac": 12},
-                    {"id": "npc_sergeant", "name": "Sergeant Bram", "location_id": "loc_start", "max_hp": 12, "current_hp": 12, "ac": 13},
-                    {"id": "npc_scholar", "name": "Scholar Nyx", "location_id": "loc_start", "max_hp": 9, "current_hp": 9, "ac": 11},
-                ],
-                "world_state": {
-                    "world_date": "1 Ches 1492 DR",
-                    "world_time": "08:00",
-                    "weather": "mist",
-                    "region": "Greenmarch",
-                    "location_id": "loc_start",
-                },
-                "hooks": ["Find who stole the Ashen Crown"],
-            },
-        )
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Session zero seed")
+        _session.restore(self.template)
+        self._conn = None
 
     def tearDown(self):
-        cdir = CAMPAIGNS_ROOT / self.campaign_id
-        if cdir.exists():
-            shutil.rmtree(cdir)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        _session.discard_campaign(self.campaign_id)
 
     def _campaign_db(self):
-        return CAMPAIGNS_ROOT / self.campaign_id / "campaign.db"
+        return _session.campaigns_root / self.campaign_id / "campaign.db"
 
     def _events_path(self):
-        return CAMPAIGNS_ROOT / self.campaign_id / "events.ndjson"
-
-    def _db_event_ids(self):
-        conn = sqlite3.connect(self._campaign_db())
-        conn.row_factory = sqlite3.Row
-        ids = [
-            row["id"]
-            for row in conn.execute(
+        return _session.campaigns_root / self.campaign_id / "events.ndjson"
+
+    def assert_has_keys(self, container, keys):
+        missing = sorted(set(keys).difference(container))
+        self.assertFalse(missing, f"missing keys: {missing}")
+
+    def _db(self):
+        # Read-only handle reused for every direct look at campaign.db within one test.
+        if self._conn is None:
+            self._conn = sqlite3.connect(f"{self._campaign_db().as_uri()}?mode=ro", uri=True)
+        return self._conn
+
+    def _iter_file_event_ids(self):
+        with self._events_path().open("rb") as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                # Full parse per line, so a truncated or corrupt record fails instead of matching a prefix.
+                yield decode(line)["id"]
+
+    def assert_event_log_parity(self):
+        # Walk committed DB events and events.ndjson in lock-step.
+        committed_ids = (
+            event_id
+            for (event_id,) in self._db().execute(
                 "SELECT id FROM events WHERE campaign_id = ? AND stage = 'committed' ORDER BY rowid",
                 (self.campaign_id,),
             )
-        ]
-        conn.close()
-        return ids
-
-    def _file_event_ids(self):
-        ids = []
-        for line in self._events_path().read_text(encoding="utf-8").splitlines():
-            if line.strip():
-                ids.append(json.loads(line)["id"])
-        return ids
+        )
+        for index, (db_id, file_id) in enumerate(zip_longest(committed_ids, self._iter_file_event_ids())):
+            if db_id != file_id:
+                self.fail(f"event log diverges at committed event {index}: db={db_id!r} file={file_id!r}")
 
     def test_00_migrations_and_schema_health(self):
         validate = run_dmctl("validate", "--campaign", self.campaign_id)
         self.assertTrue(validate["ok"])
 
-        conn = sqlite3.connect(self._campaign_db())
-        conn.row_factory = sqlite3.Row
-        schema_version = conn.execute("SELECT value FROM schema_meta WHERE key = 'schema_version'").fetchone()
-        applied = [r["name"] for r in conn.execute("SELECT name FROM applied_migrations ORDER BY version")]
-        conn.close()
+        conn = self._db()
+        (schema_version,) = conn.execute("SELECT value FROM schema_meta WHERE key = 'schema_version'").fetchone()
+        applied = {name for (name,) in conn.execute("SELECT name FROM applied_migrations")}
 
-        self.assertEqual(int(schema_version["value"]), 6)
-        self.assertIn("001_init.sql", applied)
-        self.assertIn("002_reliability_core.sql", applied)
-        self.assertIn("003_engagement_rewards.sql", applied)
-        self.assertIn("004_player_views.sql", applied)
-        self.assertIn("005_npc_full_stat_blocks.sql", applied)
-        self.assertIn("006_roll_policy_v1.sql", applied)
+        self.assertEqual(int(schema_version), 6)
+        self.assertLessEqual(REQUIRED_MIGRATIONS, applied, f"missing migrations: {sorted(REQUIRED_MIGRATIONS - applied)}")
 
     def test_01_turn_diff_required_categories(self):
-        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-        run_dmctl(
-            "state",
-            "set",
-            "--campaign",
-            self.campaign_id,
-            payload={
-                "world_state": {"world_time": "09:00", "weather": "rain"},
-                "public_note": "Storm clouds gather.",
-            },
-        )
-        run_dmctl(
-            "relationship",
-            "adjust",
-            "--campaign",
+        steps = _session.run_turn(
             self.campaign_id,
-            payload={
-                "source_type": "pc",
-                "source_id": "pc_hero",
-                "target_type": "npc",
-                "target_id": "npc_mayor",
-                "trust_delta": 1,
-                "reputation_delta": 1,
-            },
+            [
+                {
+                    "argv": ["state", "set"],
+                    "payload": {
+                        "world_state": {"world_time": "09:00", "weather": "rain"},
+                        "public_note": "Storm clouds gather.",
+                    },
+                },
+                {
+                    "argv": ["relationship", "adjust"],
+                    "payload": {
+                        "source_type": "pc",
+                        "source_id": "pc_hero",
+                        "target_type": "npc",
+                        "target_id": "npc_mayor",
+                        "trust_delta": 1,
+                        "reputation_delta": 1,
+                    },
+                },
+            ],
+            "Morning updates",
         )
-        commit = run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Morning updates")
+        commit = steps[-1]
         self.assertIn("diff_summary", commit["data"])
         self.assertIn("snapshot_ref", commit["data"])
 
         diff = run_dmctl("turn", "diff", "--campaign", self.campaign_id)
-        payload = diff["data"]["diff"]
-        for key in [
-            "time_advanced",
-            "location_change",
-            "hp_resources_changed",
-            "inventory_currency_changed",
-            "relationship_reputation_changed",
-            "quest_rumor_clock_updates",
-        ]:
-            self.assertIn(key, payload)
+        self.assert_has_keys(diff["data"]["diff"], REQUIRED_DIFF_KEYS)
 
     def test_02_rollback_event_log_parity(self):
-        marker_name = f"RollbackParity-{uuid.uuid4().hex[:6]}"
+        marker_name = f"RollbackParity-{secrets.token_hex(3)}"
 
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
         run_dmctl(
@@ -186,19 +167,15 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
         )
         run_dmctl("turn", "rollback", "--campaign", self.campaign_id, payload={"reason": "Parity check"})
 
-        conn = sqlite3.connect(self._campaign_db())
-        conn.row_factory = sqlite3.Row
-        staged_count = conn.execute(
-            "SELECT COUNT(*) AS c FROM events WHERE campaign_id = ? AND stage = 'staged'",
+        self.assert_event_log_parity()
+        (staged_count,) = self._db().execute(
+            "SELECT COUNT(*) FROM events WHERE campaign_id = ? AND stage = 'staged'",
             (self.campaign_id,),
-        ).fetchone()["c"]
-        conn.close()
-
-        self.assertEqual(staged_count, 0)
-        self.assertEqual(self._db_event_ids(), self._file_event_ids())
+        ).fetchone()
+        self.assertEqual(staged_count, 0, "rollback left staged events behind")
 
-        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--full")
-        names = {row["item_name"] for row in state["data"]["inventory"]}
+        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--path", "inventory")
+        names = {row["item_name"] for row in state["data"]["value"]}
         self.assertNotIn(marker_name, names)
 
     def test_03_campaign_load_and_turn_numbers_anchor_to_latest_committed(self):
@@ -221,18 +198,14 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
         self.assertEqual(load_after_rollback["data"]["latest_turn_any"]["status"], "rolled_back")
         self.assertLess(load_after_rollback["data"]["latest_turn_any"]["turn_number"], 0)
 
-        retry_begin = run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-        self.assertEqual(retry_begin["data"]["turn"]["turn_number"], baseline_turn_number + 1)
-        run_dmctl(
-            "world",
-            "pulse",
-            "--campaign",
+        retry_begin = _session.run_turn(
             self.campaign_id,
-            payload={"hours": 1, "add_hooks": ["retry-turn-number-probe"]},
-        )
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "Turn numbering probe commit")
+            [{"argv": ["world", "pulse"], "payload": {"hours": 1, "add_hooks": ["retry-turn-number-probe"]}}],
+            "Turn numbering probe commit",
+        )[0]
+        self.assertEqual(retry_begin["data"]["turn"]["turn_number"], baseline_turn_number + 1)
 
-        conn = sqlite3.connect(self._campaign_db())
+        conn = self._db()
         committed_rows = conn.execute(
             "SELECT status FROM turns WHERE campaign_id = ? AND turn_number = ? ORDER BY id",
             (self.campaign_id, baseline_turn_number + 1),
@@ -241,14 +214,13 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
             "SELECT turn_number FROM turns WHERE campaign_id = ? AND status = 'rolled_back' ORDER BY id",
             (self.campaign_id,),
         ).fetchall()
-        conn.close()
         statuses = [row[0] for row in committed_rows]
         self.assertEqual(statuses, ["committed"])
         self.assertGreaterEqual(len(rolled_back_rows), 1)
         self.assertTrue(all(int(row[0]) < 0 for row in rolled_back_rows))
 
     def test_03_seed_requires_minimum_npcs(self):
-        campaign_id = f"seed_{uuid.uuid4().hex[:8]}"
+        campaign_id = f"seed_{secrets.token_hex(4)}"
         try:
             run_dmctl("campaign", "create", "--campaign", campaign_id)
             run_dmctl("turn", "begin", "--campaign", campaign_id)
@@ -265,23 +237,18 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
             )
             self.assertEqual(bad["error"], "seed_requires_three_npcs")
         finally:
-            cdir = CAMPAIGNS_ROOT / campaign_id
-            if cdir.exists():
-                shutil.rmtree(cdir)
+            _session.discard_campaign(campaign_id)
 
     def test_04_compatibility_fixture_contract(self):
-        fixture = json.loads(FIXTURE_PATH.read_text(encoding="utf-8"))
-        c_id = f"compat_{uuid.uuid4().hex[:8]}"
+        c_id = f"compat_{secrets.token_hex(4)}"
         try:
             create = run_dmctl("campaign", "create", "--campaign", c_id, "--name", "Compat")
-            self.assertEqual(create["command"], fixture["campaign_create"]["command"])
-            for key in fixture["campaign_create"]["data_keys"]:
-                self.assertIn(key, create["data"])
+            self.assertEqual(create["command"], FIXTURE["campaign_create"]["command"])
+            self.assert_has_keys(create["data"], FIXTURE["campaign_create"]["data_keys"])
 
             begin = run_dmctl("turn", "begin", "--campaign", c_id)
-            self.assertEqual(begin["command"], fixture["turn_begin"]["command"])
-            for key in fixture["turn_begin"]["data_keys"]:
-                self.assertIn(key, begin["data"])
+            self.assertEqual(begin["command"], FIXTURE["turn_begin"]["command"])
+            self.assert_has_keys(begin["data"], FIXTURE["turn_begin"]["data_keys"])
 
             run_dmctl(
                 "campaign",
@@ -294,9 +261,8 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
                 },
             )
             commit = run_dmctl("turn", "commit", "--campaign", c_id, "--summary", "Compat turn")
-            self.assertEqual(commit["command"], fixture["turn_commit"]["command"])
-            for key in fixture["turn_commit"]["data_keys"]:
-                self.assertIn(key, commit["data"])
+            self.assertEqual(commit["command"], FIXTURE["turn_commit"]["command"])
+            self.assert_has_keys(commit["data"], FIXTURE["turn_commit"]["data_keys"])
 
             run_dmctl("turn", "begin", "--campaign", c_id)
             commit_full = run_dmctl("turn", "commit", "--campaign", c_id, "--summary", "Compat verbose", "--full")
@@ -304,76 +270,72 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
             self.assertIn("snapshot", commit_full["data"])
 
             turn_diff = run_dmctl("turn", "diff", "--campaign", c_id)
-            self.assertEqual(turn_diff["command"], fixture["turn_diff"]["command"])
-            for key in fixture["turn_diff"]["data_keys"]:
-                self.assertIn(key, turn_diff["data"])
+            self.assertEqual(turn_diff["command"], FIXTURE["turn_diff"]["command"])
+            self.assert_has_keys(turn_diff["data"], FIXTURE["turn_diff"]["data_keys"])
         finally:
-            cdir = CAMPAIGNS_ROOT / c_id
-            if cdir.exists():
-                shutil.rmtree(cdir)
+            _session.discard_campaign(c_id)
 
     def test_05_item_grant_creates_missing_explicit_item_id(self):
-        explicit_item_id = f"item_explicit_{uuid.uuid4().hex[:6]}"
-        item_name = f"Trace Fiber {uuid.uuid4().hex[:6]}"
+        explicit_item_id = f"item_explicit_{secrets.token_hex(3)}"
+        item_name = f"Trace Fiber {secrets.token_hex(3)}"
 
-        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-        granted = run_dmctl(
-            "item",
-            "grant",
-            "--campaign",
+        granted = _session.run_turn(
             self.campaign_id,
-            payload={
-                "owner_type": "pc",
-                "owner_id": "pc_hero",
-                "item_id": explicit_item_id,
-                "item_name": item_name,
-                "stackable": False,
-                "quantity": 1,
-            },
-        )
+            [
+                {
+                    "argv": ["item", "grant"],
+                    "payload": {
+                        "owner_type": "pc",
+                        "owner_id": "pc_hero",
+                        "item_id": explicit_item_id,
+                        "item_name": item_name,
+                        "stackable": False,
+                        "quantity": 1,
+                    },
+                }
+            ],
+            "explicit item grant",
+        )[1]
         self.assertEqual(granted["data"]["item"]["id"], explicit_item_id)
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "explicit item grant")
 
-        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--full")
-        names = {row["item_name"] for row in state["data"]["inventory"]}
+        state = run_dmctl("state", "get", "--campaign", self.campaign_id, "--include-hidden", "--path", "inventory")
+        names = {row["item_name"] for row in state["data"]["value"]}
         self.assertIn(item_name, names)
 
     def test_06_quest_update_normalizes_status_and_validates_objectives(self):
-        run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-        run_dmctl(
-            "quest",
-            "add",
-            "--campaign",
-            self.campaign_id,
-            payload={
-                "id": "quest_status_norm",
-                "title": "Status Normalization Drill",
-                "description": "Exercise quest/objective status handling.",
-            },
-        )
-        updated = run_dmctl(
-            "quest",
-            "update",
-            "--campaign",
+        updated = _session.run_turn(
             self.campaign_id,
-            payload={
-                "quest_id": "quest_status_norm",
-                "status": "complete",
-                "objective_updates": [
-                    {
-                        "id": "obj_status_norm",
-                        "description": "Interview the witness.",
-                        "status": "completed",
-                        "order_index": 0,
-                    }
-                ],
-            },
-        )
+            [
+                {
+                    "argv": ["quest", "add"],
+                    "payload": {
+                        "id": "quest_status_norm",
+                        "title": "Status Normalization Drill",
+                        "description": "Exercise quest/objective status handling.",
+                    },
+                },
+                {
+                    "argv": ["quest", "update"],
+                    "payload": {
+                        "quest_id": "quest_status_norm",
+                        "status": "complete",
+                        "objective_updates": [
+                            {
+                                "id": "obj_status_norm",
+                                "description": "Interview the witness.",
+                                "status": "completed",
+                                "order_index": 0,
+                            }
+                        ],
+                    },
+                },
+            ],
+            "status normalization",
+        )[2]
         self.assertEqual(updated["data"]["quest"]["status"], "completed")
         objective = [row for row in updated["data"]["objectives"] if row["id"] == "obj_status_norm"]
         self.assertEqual(len(objective), 1)
         self.assertEqual(objective[0]["status"], "complete")
-        run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "status normalization")
 
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
         bad = run_dmctl(
@@ -432,20 +394,21 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
 
     def test_08_chained_committed_undo_maintains_event_log_parity(self):
         for idx in range(2):
-            run_dmctl("turn", "begin", "--campaign", self.campaign_id)
-            run_dmctl(
-                "item",
-                "grant",
-                "--campaign",
+            _session.run_turn(
                 self.campaign_id,
-                payload={
-                    "owner_type": "pc",
-                    "owner_id": "pc_hero",
-                    "item_name": f"undo_chain_marker_{idx}_{uuid.uuid4().hex[:6]}",
-                    "quantity": 1,
-                },
+                [
+                    {
+                        "argv": ["item", "grant"],
+                        "payload": {
+                            "owner_type": "pc",
+                            "owner_id": "pc_hero",
+                            "item_name": f"undo_chain_marker_{idx}_{secrets.token_hex(3)}",
+                            "quantity": 1,
+                        },
+                    }
+                ],
+                f"undo chain commit {idx}",
             )
-            run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", f"undo chain commit {idx}")
 
         first_undo = run_dmctl("ooc", "undo_last_turn", "--campaign", self.campaign_id)
         self.assertEqual(first_undo["data"]["turn"]["status"], "rolled_back")
@@ -457,25 +420,21 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
 
         validate = run_dmctl("validate", "--campaign", self.campaign_id)
         self.assertTrue(validate["ok"])
-        self.assertEqual(self._db_event_ids(), self._file_event_ids())
+        self.assert_event_log_parity()
 
     def test_09_campaign_repair_events_dry_run_then_apply(self):
-        fake_id = f"evt_fake_{uuid.uuid4().hex[:10]}"
-        with self._events_path().open("a", encoding="utf-8") as handle:
-            handle.write(
-                json.dumps(
-                    {
-                        "id": fake_id,
-                        "campaign_id": self.campaign_id,
-                        "turn_id": 9999,
-                        "command": "fake",
-                        "payload": {},
-                        "timestamp": "2000-01-01T00:00:00+00:00",
-                    },
-                    separators=(",", ":"),
-                )
-                + "\n"
-            )
+        fake_id = f"evt_fake_{secrets.token_hex(5)}"
+        load_dmctl().append_event_file(
+            self._events_path(),
+            {
+                "id": fake_id,
+                "campaign_id": self.campaign_id,
+                "turn_id": 9999,
+                "command": "fake",
+                "payload": {},
+                "timestamp": "2000-01-01T00:00:00+00:00",
+            },
+        )
 
         dry_run = run_dmctl("campaign", "repair-events", "--campaign", self.campaign_id, "--dry-run")
         self.assertTrue(dry_run["data"]["mismatch"])
@@ -490,11 +449,11 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
 
         validate = run_dmctl("validate", "--campaign", self.campaign_id)
         self.assertTrue(validate["ok"])
-        self.assertEqual(self._db_event_ids(), self._file_event_ids())
+        self.assert_event_log_parity()
 
     def test_10_campaign_repair_events_handles_non_object_ndjson_line(self):
-        with self._events_path().open("a", encoding="utf-8") as handle:
-            handle.write("123\n")
+        # The helper serializes any JSON value, which is how this non-object record gets in.
+        load_dmctl().append_event_file(self._events_path(), 123)
 
         dry_run = run_dmctl("campaign", "repair-events", "--campaign", self.campaign_id, "--dry-run")
         self.assertTrue(dry_run["data"]["mismatch"])
@@ -508,10 +467,10 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
 
         validate = run_dmctl("validate", "--campaign", self.campaign_id)
         self.assertTrue(validate["ok"])
-        self.assertEqual(self._db_event_ids(), self._file_event_ids())
+        self.assert_event_log_parity()
 
     def test_11_turn_begin_after_initial_rollback_stays_one_based(self):
-        campaign_id = f"rollstart_{uuid.uuid4().hex[:8]}"
+        campaign_id = f"rollstart_{secrets.token_hex(4)}"
         try:
             run_dmctl("campaign", "create", "--campaign", campaign_id, "--name", "Rollback Start Probe")
             first_begin = run_dmctl("turn", "begin", "--campaign", campaign_id)
@@ -528,9 +487,7 @@ class TestDMCTLReliabilityV2(unittest.TestCase):
             second_begin = run_dmctl("turn", "begin", "--campaign", campaign_id)
             self.assertEqual(second_begin["data"]["turn"]["turn_number"], 1)
         finally:
-            cdir = CAMPAIGNS_ROOT / campaign_id
-            if cdir.exists():
-                shutil.rmtree(cdir)
+            _session.discard_campaign(campaign_id)
 
 
 if __name__ == "__main__":
@@ -1,29 +1,83 @@
-import json
 import random
 import sqlite3
-import shutil
-import subprocess
+import sys
 import unittest
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
+
+sys.path.insert(0, str(ROOT / "tests"))
+from dmctl_harness import DmctlSession  # noqa: E402
+
+DICE_SIDES = (4, 6, 8, 10, 12, 20)
+
+EXTRA_EVENT_TEMPLATE = (
+    b'{"id":"evt_extra_%s","campaign_id":"%s","turn_id":9999,"command":"fake",'
+    b'"payload":{},"timestamp":"2000-01-01T00:00:00+00:00"}\n'
+)
+
+# Rows inserted behind dmctl's back so validate has orphan references to report.
+INSERT_ORPHAN_ITEM_SQL = """
+INSERT INTO items (
+    id, campaign_id, name, description, stackable, consumable, max_charges, charges, created_at, updated_at
+) VALUES (?, ?, ?, '', 1, 0, 0, 0, ?, ?)
+"""
+INSERT_ORPHAN_INVENTORY_SQL = """
+INSERT INTO inventories (campaign_id, owner_type, owner_id, item_id, quantity, updated_at)
+VALUES (?, 'pc', 'pc_missing', ?, 1, ?)
+"""
+INSERT_ORPHAN_RELATIONSHIP_SQL = """
+INSERT INTO relationships (
+    id, campaign_id, source_type, source_id, target_type, target_id, trust, fear, debt, reputation, updated_at
+) VALUES (?, ?, 'pc', 'pc_missing', 'npc', 'npc_missing', 0, 0, 0, 0, ?)
+"""
+INSERT_ORPHAN_REWARD_SQL = """
+INSERT INTO reward_events (
+    id, campaign_id, turn_id, source_type, source_id, recipient_type, recipient_id, reward_json, created_at
+) VALUES (?, ?, NULL, 'manual', '', 'npc', 'npc_missing', '{}', ?)
+"""
+INSERT_ORPHAN_SPELL_SQL = """
+INSERT INTO spells_active (
+    id, campaign_id, caster_type, caster_id, spell_name, target_type, target_id,
+    remaining_rounds, requires_concentration, created_at, updated_at
+) VALUES (?, ?, 'pc', 'pc_missing', 'Mage Armor', '', '', 8, 0, ?, ?)
+"""
+
+
+_session = None
+
+
+def setUpModule():
+    global _session
+    _session = DmctlSession("dmctl_val_")
+
+
+def tearDownModule():
+    _session.close()
 
 
 def run_dmctl(*parts, payload=None, expect_ok=True):
-    cmd = [str(DMCTL), *parts]
-    if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), check=False)
-    body = json.loads(result.stdout.strip())
-    if expect_ok and not body.get("ok"):
-        raise AssertionError(f"Unexpected failure: {cmd} -> {body}")
-    if not expect_ok and body.get("ok"):
-        raise AssertionError(f"Unexpected success: {cmd} -> {body}")
-    return body
+    return _session.run(*parts, payload=payload, expect_ok=expect_ok)
+
+
+def gen_dice_formulas(rng, count=80):
+    # Draw every pool size, die count, die size and modifier up front, then stitch them together.
+    pool_counts = rng.choices((1, 2, 3), k=count)
+    total_pools = sum(pool_counts)
+    dice_counts = rng.choices(range(1, 5), k=total_pools)
+    dice_sides = rng.choices(DICE_SIDES, k=total_pools)
+    pools = iter([f"{n}d{sides}" for n, sides in zip(dice_counts, dice_sides)])
+    formulas = []
+    for pool_count, modifier in zip(pool_counts, rng.choices(range(-5, 6), k=count)):
+        formula = "+".join(next(pools) for _ in range(pool_count))
+        if modifier < 0:
+            formula += str(modifier)
+        elif modifier > 0:
+            formula += f"+{modifier}"
+        formulas.append(formula)
+    return formulas
 
 
 class TestDMCTLValidationV2(unittest.TestCase):
@@ -31,29 +85,27 @@ class TestDMCTLValidationV2(unittest.TestCase):
         self.campaign_id = f"val_{uuid.uuid4().hex[:10]}"
         run_dmctl("campaign", "create", "--campaign", self.campaign_id)
         run_dmctl("turn", "begin", "--campaign", self.campaign_id)
+        self._conn = None
 
     def tearDown(self):
-        cdir = CAMPAIGNS_ROOT / self.campaign_id
-        if cdir.exists():
-            shutil.rmtree(cdir)
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        _session.discard_campaign(self.campaign_id)
+
+    def db(self):
+        # One connection per test for direct writes to campaign.db; dmctl keeps its own.
+        if self._conn is None:
+            self._conn = sqlite3.connect(_session.campaigns_root / self.campaign_id / "campaign.db")
+            self._conn.execute("PRAGMA synchronous=OFF")
+        return self._conn
 
     def test_dice_formula_fuzz(self):
-        rng = random.Random(1337)
-        for _ in range(80):
-            pools = []
-            pool_count = rng.randint(1, 3)
-            for _ in range(pool_count):
-                n = rng.randint(1, 4)
-                sides = rng.choice([4, 6, 8, 10, 12, 20])
-                pools.append(f"{n}d{sides}")
-            modifier = rng.randint(-5, 5)
-            formula = "+".join(pools)
-            if modifier < 0:
-                formula += str(modifier)
-            elif modifier > 0:
-                formula += f"+{modifier}"
-
-            body = run_dmctl("dice", "roll", "--campaign", self.campaign_id, "--formula", formula)
+        commands = [{"argv": ["dice", "roll", "--formula", formula]} for formula in gen_dice_formulas(random.Random(1337))]
+
+        results = run_dmctl("batch", "--campaign", self.campaign_id, payload={"commands": commands})["data"]["results"]
+        self.assertEqual(len(results), len(commands))
+        for body in results:
             self.assertTrue(body["ok"])
             self.assertIn("total", body["data"])
             self.assertIn("raw_dice", body["data"])
@@ -84,23 +136,10 @@ class TestDMCTLValidationV2(unittest.TestCase):
 
     def test_validate_reports_event_log_parity_details_on_mismatch(self):
         run_dmctl("turn", "commit", "--campaign", self.campaign_id, "--summary", "validation parity baseline")
-        events_path = CAMPAIGNS_ROOT / self.campaign_id / "events.ndjson"
-        with events_path.open("a", encoding="utf-8") as handle:
-            handle.write(
-                json.dumps(
-                    {
-                        "id": f"evt_extra_{uuid.uuid4().hex[:8]}",
-                        "campaign_id": self.campaign_id,
-                        "turn_id": 9999,
-                        "command": "fake",
-                        "payload": {},
-                        "timestamp": "2000-01-01T00:00:00+00:00",
-                    },
-                    separators=(",", ":"),
-                )
-                + "\n"
-            )
-            handle.write("123\n")
+        events_path = _session.campaigns_root / self.campaign_id / "events.ndjson"
+        # One well-formed event dmctl never recorded, then a line that is not an event object.
+        with events_path.open("ab") as handle:
+            handle.write(EXTRA_EVENT_TEMPLATE % (uuid.uuid4().hex[:8].encode(), self.campaign_id.encode()) + b"123\n")
 
         validate = run_dmctl("validate", "--campaign", self.campaign_id, expect_ok=False)
         self.assertEqual(validate["error"], "validation_failed")
@@ -180,43 +219,14 @@ class TestDMCTLValidationV2(unittest.TestCase):
         self.assertEqual(bad_reward["error"], "reward_recipient_not_found")
 
     def test_validate_detects_orphan_relationship_inventory_and_reward_references(self):
-        db_path = CAMPAIGNS_ROOT / self.campaign_id / "campaign.db"
-        conn = sqlite3.connect(db_path)
         ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
         item_id = f"item_{uuid.uuid4().hex[:8]}"
-        conn.execute(
-            """
-            INSERT INTO items (
-                id, campaign_id, name, description, stackable, consumable, max_charges, charges, created_at, updated_at
-            ) VALUES (?, ?, ?, '', 1, 0, 0, 0, ?, ?)
-            """,
-            (item_id, self.campaign_id, "Orphan Probe Item", ts, ts),
-        )
-        conn.execute(
-            """
-            INSERT INTO inventories (campaign_id, owner_type, owner_id, item_id, quantity, updated_at)
-            VALUES (?, 'pc', 'pc_missing', ?, 1, ?)
-            """,
-            (self.campaign_id, item_id, ts),
-        )
-        conn.execute(
-            """
-            INSERT INTO relationships (
-                id, campaign_id, source_type, source_id, target_type, target_id, trust, fear, debt, reputation, updated_at
-            ) VALUES (?, ?, 'pc', 'pc_missing', 'npc', 'npc_missing', 0, 0, 0, 0, ?)
-            """,
-            (f"rel_{uuid.uuid4().hex[:8]}", self.campaign_id, ts),
-        )
-        conn.execute(
-            """
-            INSERT INTO reward_events (
-                id, campaign_id, turn_id, source_type, source_id, recipient_type, recipient_id, reward_json, created_at
-            ) VALUES (?, ?, NULL, 'manual', '', 'npc', 'npc_missing', '{}', ?)
-            """,
-            (f"reward_{uuid.uuid4().hex[:8]}", self.campaign_id, ts),
-        )
-        conn.commit()
-        conn.close()
+        conn = self.db()
+        with conn:
+            conn.execute(INSERT_ORPHAN_ITEM_SQL, (item_id, self.campaign_id, "Orphan Probe Item", ts, ts))
+            conn.execute(INSERT_ORPHAN_INVENTORY_SQL, (self.campaign_id, item_id, ts))
+            conn.execute(INSERT_ORPHAN_RELATIONSHIP_SQL, (f"rel_{uuid.uuid4().hex[:8]}", self.campaign_id, ts))
+            conn.execute(INSERT_ORPHAN_REWARD_SQL, (f"reward_{uuid.uuid4().hex[:8]}", self.campaign_id, ts))
 
         validate = run_dmctl("validate", "--campaign", self.campaign_id, expect_ok=False)
         self.assertEqual(validate["error"], "validation_failed")
@@ -227,20 +237,10 @@ class TestDMCTLValidationV2(unittest.TestCase):
         self.assertIn("invalid reward recipients found", errors)
 
     def test_validate_detects_orphan_active_spell_casters(self):
-        db_path = CAMPAIGNS_ROOT / self.campaign_id / "campaign.db"
-        conn = sqlite3.connect(db_path)
         ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
-        conn.execute(
-            """
-            INSERT INTO spells_active (
-                id, campaign_id, caster_type, caster_id, spell_name, target_type, target_id,
-                remaining_rounds, requires_concentration, created_at, updated_at
-            ) VALUES (?, ?, 'pc', 'pc_missing', 'Mage Armor', '', '', 8, 0, ?, ?)
-            """,
-            (f"spell_{uuid.uuid4().hex[:8]}", self.campaign_id, ts, ts),
-        )
-        conn.commit()
-        conn.close()
+        conn = self.db()
+        with conn:
+            conn.execute(INSERT_ORPHAN_SPELL_SQL, (f"spell_{uuid.uuid4().hex[:8]}", self.campaign_id, ts, ts))
 
         validate = run_dmctl("validate", "--campaign", self.campaign_id, expect_ok=False)
         self.assertEqual(validate["error"], "validation_failed")
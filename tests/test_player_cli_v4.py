@@ -1,174 +1,157 @@
-import json
-import shutil
-import subprocess
+import sys
 import unittest
 import uuid
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
-DMCTL = ROOT / "tools" / "dmctl"
 PCCTL = ROOT / "tools" / "pcctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
 
+sys.path.insert(0, str(ROOT / "tests"))
+from dmctl_harness import DMCTL_STR, DmctlSession, encode  # noqa: E402
 
-def run_json(cmd, expect_ok=True):
-    result = subprocess.run(cmd, capture_output=True, text=True, cwd=str(ROOT), check=False)
-    try:
-        body = json.loads(result.stdout.strip())
-    except json.JSONDecodeError as exc:
-        raise AssertionError(f"Command did not return JSON. CMD={cmd} STDOUT={result.stdout} STDERR={result.stderr}") from exc
+_session = None
 
-    if expect_ok and not body.get("ok"):
-        raise AssertionError(f"Command failed unexpectedly. CMD={cmd} BODY={body} STDERR={result.stderr}")
-    if not expect_ok and body.get("ok"):
-        raise AssertionError(f"Command unexpectedly succeeded. CMD={cmd} BODY={body}")
-    return body
+
+def setUpModule():
+    global _session
+    _session = DmctlSession("dmctl_player_v4_")
+
+
+def tearDownModule():
+    _session.close()
 
 
 def run_dmctl(*parts, payload=None, expect_ok=True):
-    cmd = [str(DMCTL), *parts]
-    if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
-    return run_json(cmd, expect_ok=expect_ok)
+    return _session.run(*parts, payload=payload, expect_ok=expect_ok)
 
 
 def run_pcctl(*parts, payload=None, expect_ok=True):
     cmd = [str(PCCTL), *parts]
     if payload is not None:
-        cmd.extend(["--payload", json.dumps(payload, separators=(",", ":"))])
-    return run_json(cmd, expect_ok=expect_ok)
+        cmd.extend(["--payload", encode(payload)])
+    return _session.run_json(cmd, expect_ok=expect_ok)
 
 
 class TestPlayerCliV4(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
-        cls.campaign_ids = []
-
-    @classmethod
-    def tearDownClass(cls):
-        for campaign_id in cls.campaign_ids:
-            cdir = CAMPAIGNS_ROOT / campaign_id
-            if cdir.exists():
-                shutil.rmtree(cdir)
+        # Each fixture variant is seeded once and restored for every test that asks for it.
+        cls.templates = {
+            second_active: _session.snapshot(cls.seed_fixture_campaign(second_active=second_active))
+            for second_active in (False, True)
+        }
+
+    def setUp(self):
+        self.campaign_ids = []
+
+    def tearDown(self):
+        for campaign_id in self.campaign_ids:
+            _session.discard_campaign(campaign_id)
+
+    def create_fixture_campaign(self, *, second_active=False):
+        campaign_id = _session.restore(self.templates[second_active])
+        self.campaign_ids.append(campaign_id)
+        return campaign_id
 
-    @classmethod
-    def create_fixture_campaign(cls, *, second_active=False):
+    @staticmethod
+    def seed_fixture_campaign(*, second_active=False):
         campaign_id = f"player_v4_{uuid.uuid4().hex[:10]}"
-        cls.campaign_ids.append(campaign_id)
-
         run_dmctl("campaign", "create", "--campaign", campaign_id, "--name", "Player View Fixture")
-        run_dmctl("turn", "begin", "--campaign", campaign_id)
-        run_dmctl(
-            "state",
-            "set",
-            "--campaign",
+        _session.run_turn(
             campaign_id,
-            payload={
-                "locations": [
-                    {"id": "loc_start", "name": "Oakcross", "region": "Greenmarch"},
-                    {"id": "loc_keep", "name": "Raven Keep", "region": "Greenmarch"},
-                    {"id": "loc_ruins", "name": "Ash Ruins", "region": "Greenmarch"},
-                ],
-                "player_characters": [
-                    {
-                        "id": "pc_hero",
-                        "name": "Arin Vale",
-                        "class": "Rogue",
-                        "level": 3,
-                        "max_hp": 24,
-                        "current_hp": 24,
-                        "ac": 15,
-                        "location_id": "loc_start",
-                        "is_active": True,
+            [
+                {
+                    "argv": ["state", "set"],
+                    "payload": {
+                        "locations": [
+                            {"id": "loc_start", "name": "Oakcross", "region": "Greenmarch"},
+                            {"id": "loc_keep", "name": "Raven Keep", "region": "Greenmarch"},
+                            {"id": "loc_ruins", "name": "Ash Ruins", "region": "Greenmarch"},
+                        ],
+                        "player_characters": [
+                            {
+                                "id": "pc_hero",
+                                "name": "Arin Vale",
+                                "class": "Rogue",
+                                "level": 3,
+                                "max_hp": 24,
+                                "current_hp": 24,
+                                "ac": 15,
+                                "location_id": "loc_start",
+                                "is_active": True,
+                            },
+                            {
+                                "id": "pc_ally",
+                                "name": "Bryn Vale",
+                                "class": "Fighter",
+                                "level": 2,
+                                "max_hp": 18,
+                                "current_hp": 18,
+                                "ac": 14,
+                                "location_id": "loc_start",
+                                "is_active": bool(second_active),
+                            },
+                        ],
+                        "world_state": {
+                            "world_date": "1 Ches 1492 DR",
+                            "world_time": "08:00",
+                            "weather": "mist",
+                            "region": "Greenmarch",
+                            "location_id": "loc_start",
+                        },
+                        "hidden_note": "DM private continuity note",
                     },
-                    {
-                        "id": "pc_ally",
-                        "name": "Bryn Vale",
-                        "class": "Fighter",
-                        "level": 2,
-                        "max_hp": 18,
-                        "current_hp": 18,
-                        "ac": 14,
+                },
+                {
+                    "argv": ["npc", "create"],
+                    "payload": {
+                        "id": "npc_keeper",
+                        "name": "Archivist Nera",
                         "location_id": "loc_start",
-                        "is_active": bool(second_active),
+                        "max_hp": 11,
+                        "current_hp": 11,
+                        "ac": 12,
                     },
-                ],
-                "world_state": {
-                    "world_date": "1 Ches 1492 DR",
-                    "world_time": "08:00",
-                    "weather": "mist",
-                    "region": "Greenmarch",
-                    "location_id": "loc_start",
                 },
-                "hidden_note": "DM private continuity note",
-            },
-        )
-        run_dmctl(
-            "npc",
-            "create",
-            "--campaign",
-            campaign_id,
-            payload={
-                "id": "npc_keeper",
-                "name": "Archivist Nera",
-                "location_id": "loc_start",
-                "max_hp": 11,
-                "current_hp": 11,
-                "ac": 12,
-            },
-        )
-        run_dmctl(
-            "item",
-            "grant",
-            "--campaign",
-            campaign_id,
-            payload={"owner_type": "pc", "owner_id": "pc_hero", "item_name": "Torch", "quantity": 2},
-        )
-        run_dmctl(
-            "item",
-            "grant",
-            "--campaign",
-            campaign_id,
-            payload={"owner_type": "party", "owner_id": "party", "item_name": "Rope", "quantity": 1},
-        )
-        run_dmctl(
-            "item",
-            "grant",
-            "--campaign",
-            campaign_id,
-            payload={"owner_type": "npc", "owner_id": "npc_keeper", "item_name": "Hidden Sigil", "quantity": 1},
-        )
-        run_dmctl(
-            "rumor",
-            "add",
-            "--campaign",
-            campaign_id,
-            payload={
-                "id": "rumor_public",
-                "text": "The keep cellar opens at moonrise.",
-                "source": "Tavern",
-                "spread_level": 2,
-                "decay": 3,
-                "truth_status": "true",
-                "revealed_to_player": True,
-            },
-        )
-        run_dmctl(
-            "rumor",
-            "add",
-            "--campaign",
-            campaign_id,
-            payload={
-                "id": "rumor_hidden",
-                "text": "A hidden vault lies under the chapel.",
-                "source": "Unknown",
-                "spread_level": 1,
-                "decay": 1,
-                "truth_status": "false",
-                "revealed_to_player": False,
-            },
+                {
+                    "argv": ["item", "grant"],
+                    "payload": {"owner_type": "pc", "owner_id": "pc_hero", "item_name": "Torch", "quantity": 2},
+                },
+                {
+                    "argv": ["item", "grant"],
+                    "payload": {"owner_type": "party", "owner_id": "party", "item_name": "Rope", "quantity": 1},
+                },
+                {
+                    "argv": ["item", "grant"],
+                    "payload": {"owner_type": "npc", "owner_id": "npc_keeper", "item_name": "Hidden Sigil", "quantity": 1},
+                },
+                {
+                    "argv": ["rumor", "add"],
+                    "payload": {
+                        "id": "rumor_public",
+                        "text": "The keep cellar opens at moonrise.",
+                        "source": "Tavern",
+                        "spread_level": 2,
+                        "decay": 3,
+                        "truth_status": "true",
+                        "revealed_to_player": True,
+                    },
+                },
+                {
+                    "argv": ["rumor", "add"],
+                    "payload": {
+                        "id": "rumor_hidden",
+                        "text": "A hidden vault lies under the chapel.",
+                        "source": "Unknown",
+                        "spread_level": 1,
+                        "decay": 1,
+                        "truth_status": "false",
+                        "revealed_to_player": False,
+                    },
+                },
+            ],
+            "Fixture seeded",
         )
-        run_dmctl("turn", "commit", "--campaign", campaign_id, "--summary", "Fixture seeded")
         return campaign_id
 
     def test_player_rumors_allowlist_and_visibility(self):
@@ -291,7 +274,7 @@ class TestPlayerCliV4(unittest.TestCase):
         self.assertEqual(snapshot["profile"], "dm_full")
 
     def test_help_includes_player_group(self):
-        body = run_json([str(DMCTL), "--help"])
+        body = _session.run_json([DMCTL_STR, "--help"])
         groups = {row["group"]: row["actions"] for row in body["data"]["groups"]}
         self.assertIn("player", groups)
         self.assertIn("sheet", groups["player"])
@@ -1,4 +1,5 @@
 import json
+import os
 import shutil
 import sqlite3
 import subprocess
@@ -8,7 +9,8 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
+# Same resolution as dmctl, so an exported DMCTL_CAMPAIGNS_ROOT points both sides at one directory.
+CAMPAIGNS_ROOT = Path(os.environ.get("DMCTL_CAMPAIGNS_ROOT") or ROOT / ".dm" / "campaigns")
 
 
 def run_dmctl(*parts, payload=None, expect_ok=True):
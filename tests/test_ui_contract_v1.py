@@ -1,5 +1,6 @@
 import copy
 import json
+import os
 import shutil
 import subprocess
 import sys
@@ -9,7 +10,8 @@ from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
 DMCTL = ROOT / "tools" / "dmctl"
-CAMPAIGNS_ROOT = ROOT / ".dm" / "campaigns"
+# Same resolution as dmctl, so an exported DMCTL_CAMPAIGNS_ROOT points both sides at one directory.
+CAMPAIGNS_ROOT = Path(os.environ.get("DMCTL_CAMPAIGNS_ROOT") or ROOT / ".dm" / "campaigns")
 FIXTURE_PATH = ROOT / "tests" / "fixtures" / "ui_contract_golden.json"
 
 sys.path.insert(0, str(ROOT / "tools"))